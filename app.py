@@ -1,18 +1,156 @@
 import dash
-from dash import dcc, html, no_update, dash_table
-from dash.dependencies import Input, Output
-import plotly.express as px
+from dash import dcc, html, no_update, dash_table, Patch
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 import pandas as pd
 import dash_bootstrap_components as dbc
-from ranker import Ranker
+from catalog import CATALOG, COPILOT_BUNDLE
+from ranker import Ranker, RankerSession
 from functools import partial
+import json
+import os
+import pkgutil
+import threading
+import uuid
+from cache import RecommendationCache, SessionStore, SQLiteBackend, normalize_key
+from metrics import METRICS
+
+# Monthly price of the Copilot bundle, prepaid out of the budget when the user ticks it
+COPILOT_PRICE = CATALOG.bundles[COPILOT_BUNDLE]
+
+# Custom layout shared by both graphs
+custom_layout = {
+    'height': 650,
+    'plot_bgcolor': '#288cb4',
+    'paper_bgcolor': '#002b36',
+    'font': {'color': '#ffffff'},
+    'title': {'x': 0.5},
+    'xaxis': {'showgrid': False, 'gridcolor': '#666666'},
+    'yaxis': {'showgrid': False, 'gridcolor': '#666666'}
+}
+
+# Default data for graphs before anything is submitted
+AUTO_CHART_TASKS = list(CATALOG.tasks) + ["Total"]
+DEFAULT_AUTO_CHART = {"Task": AUTO_CHART_TASKS, "Hours saved": [0] * len(AUTO_CHART_TASKS), "Remaining hours": [0] * len(AUTO_CHART_TASKS)}
+DEFAULT_QUALITY_CHART = {"Service": ["A"], "Quality Score": [0]}
+DEFAULT_SWEEP_CHART = {"Budget": [0], "Hours saved": [0], "Your budget": [0], "Your hours saved": [0]}
+AUTO_SERIES = [("Hours saved", "#636efa"), ("Remaining hours", "#EF553B")]
+
+
+# Plotly's default theme, read straight from its package data: constructing go.Figure objects
+# pulls in plotly.offline and, through it, IPython, which dominated the app's import time
+PLOTLY_TEMPLATE = json.loads(pkgutil.get_data('plotly', 'package_data/templates/plotly.json'))
+
+TITLE_FONT = dict(
+    family="Helvetica",  # Specify the font family if needed
+    size=24,  # Adjust the size as needed
+    color="white"  # Adjust the color if needed
+)
+
+
+def figure_layout(**layout):
+    # custom_layout with the given properties merged in, one level deep
+    merged = {key: dict(value) if isinstance(value, dict) else value for key, value in custom_layout.items()}
+    for key, value in layout.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    merged['template'] = PLOTLY_TEMPLATE
+    return merged
+
+
+def auto_figure(chart=DEFAULT_AUTO_CHART):
+    # Code for un-centering the title: override it in the layout below
+    #   title={
+    #       'text': 'Your Graph Title',
+    #       'x': 0.45,  # Adjust this value to shift the title left (<0.5) or right (>0.5)
+    #       'xanchor': 'center',  # Ensures the title will still center at the new x position
+    #       'yanchor': 'top'
+    #   }
+    return {
+        'data': [
+            {'type': 'bar', 'x': chart["Task"], 'y': chart[name], 'name': name, 'legendgroup': name, 'offsetgroup': name,
+             'alignmentgroup': 'True', 'marker': {'color': color, 'line': {'width': 0}}, 'texttemplate': '%{y}',
+             'textposition': 'inside', 'hovertemplate': f"variable={name}<br>Task=%{{x}}<br>Total Hours=%{{y}}<extra></extra>"}
+            for name, color in AUTO_SERIES
+        ],
+        'layout': figure_layout(
+            barmode='relative', legend={'tracegroupgap': 0, 'title': {'text': ''}}, transition={'duration': 500},
+            title={'text': "Time Saved (Hours)", 'y': 0.95, 'font': TITLE_FONT},
+            xaxis={'title': {'text': "Task", 'standoff': 1}}, yaxis={'title': {'text': "Total Hours"}},
+        ),
+    }
+
+
+def quality_figure(chart=DEFAULT_QUALITY_CHART):
+    return {
+        'data': [
+            {'type': 'bar', 'x': chart["Service"], 'y': chart["Quality Score"], 'name': '', 'showlegend': False,
+             'marker': {'color': "#636efa"}, 'hovertemplate': "Recommended Service=%{x}<br>Quality Score=%{y}<extra></extra>"},
+        ],
+        'layout': figure_layout(
+            barmode='relative', margin={'t': 60},
+            title={'text': "Quality Scores (1-10)", 'y': 1.0, 'font': TITLE_FONT},
+            xaxis={'title': {'text': "Recommended Service"}}, yaxis={'title': {'text': "Quality Score"}},
+        ),
+    }
+
+
+def sweep_figure(chart=DEFAULT_SWEEP_CHART):
+    return {
+        'data': [
+            {'type': 'scatter', 'x': chart["Budget"], 'y': chart["Hours saved"], 'name': 'Best selection', 'mode': 'lines',
+             'line': {'color': "#636efa", 'shape': 'hv'}, 'hovertemplate': "Budget=%{x}<br>Hours saved=%{y}<extra></extra>"},
+            {'type': 'scatter', 'x': chart["Your budget"], 'y': chart["Your hours saved"], 'name': 'Your budget', 'mode': 'markers',
+             'marker': {'color': "#EF553B", 'size': 12}, 'hovertemplate': "Your budget=%{x}<br>Hours saved=%{y}<extra></extra>"},
+        ],
+        'layout': figure_layout(
+            height=450, legend={'title': {'text': ''}},
+            title={'text': "Hours Saved by Budget", 'y': 0.95, 'font': TITLE_FONT},
+            xaxis={'title': {'text': "Budget (dollars per month)"}}, yaxis={'title': {'text': "Hours saved"}},
+        ),
+    }
+
+
+# Figure templates are built once; callbacks only patch in new data
+AUTO_FIGURE_TEMPLATE = auto_figure()
+QUALITY_FIGURE_TEMPLATE = quality_figure()
+SWEEP_FIGURE_TEMPLATE = sweep_figure()
+
+
+def auto_patch(chart):
+    """
+    Partial update of the time-saved graph: only the x and y arrays of both series are sent.
+    """
+    patch = Patch()
+    for i, (name, _) in enumerate(AUTO_SERIES):
+        patch['data'][i]['x'] = chart["Task"]
+        patch['data'][i]['y'] = chart[name]
+    return patch
+
+
+def quality_patch(chart):
+    """
+    Partial update of the quality graph: only its x and y arrays are sent.
+    """
+    patch = Patch()
+    patch['data'][0]['x'] = chart["Service"]
+    patch['data'][0]['y'] = chart["Quality Score"]
+    return patch
+
+
+def sweep_patch(chart):
+    """
+    Partial update of the budget sweep graph: only the curve and the marker of the user's budget are sent.
+    """
+    patch = Patch()
+    patch['data'][0]['x'] = chart["Budget"]
+    patch['data'][0]['y'] = chart["Hours saved"]
+    patch['data'][1]['x'] = chart["Your budget"]
+    patch['data'][1]['y'] = chart["Your hours saved"]
+    return patch
 
-# Sample data for the bar graphs
-data = pd.DataFrame({
-    "Category": ["A", "B", "C", "D"],
-    "Value1": [10, 15, 7, 10],
-    "Value2": [5, 3, 8, 12]
-})
 
 # Initialize the Dash app with a Bootstrap theme
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.SOLAR])
@@ -41,7 +179,7 @@ app.layout = dbc.Container([
 
                         4. **Review and Adjust**: After submitting all necessary information, return to the Budget tab to generate a report of your potential toolset. You can review and adjust your budget based on the recommendations provided.
 
-                        5. **Results Analysis**: On the right side of the interface, you will see an analysis of the potential hours you can save by utilizing the recommended services. Below this, the quality scores for each recommended service are displayed, providing a qualitative measure of how much the product will improve the quality of your work.
+                        5. **Results Analysis**: On the right side of the interface, you will see an analysis of the potential hours you can save by utilizing the recommended services. Below this, the quality scores for each recommended service are displayed, providing a qualitative measure of how much the product will improve the quality of your work. The last chart shows how many hours the best selection would save at every budget, so you can see what raising or lowering your budget would change.
                         """,
                         className="tab-content-top-padding text-light")
                     ])
@@ -53,15 +191,15 @@ app.layout = dbc.Container([
                             """, className="tab-content-top-padding text-light"
                         ),
                         dbc.Label("What is your budget each month?", className="text-light"),
-                        dbc.Input(id="budget", type="number", min=0, placeholder="Dollars per month", className="mb-2"),
+                        dbc.Input(id="budget", type="number", debounce=True, min=0, placeholder="Dollars per month", className="mb-2"),
 
-                        dbc.Label("Copilot Pro (20$) contains several tools, would you like to consider this integration in the analysis?", className="text-warning"),
+                        dbc.Label(f"Copilot Pro ({COPILOT_PRICE}$) contains several tools, would you like to consider this integration in the analysis?", className="text-warning"),
                         dbc.Checkbox(id='checkbox', className='text-light', label="Enable Copilot tools"),
-                        html.Div(id='error-message', className='bg-danger'),
+                        html.Div(" ", id='error-message', className='bg-danger'),
                         dbc.Button("Submit", id="submit-button-3", color="primary", n_clicks=0, className="mb-2"),
                         dbc.Button("Generate Report", id="generate-report-1", color="success", n_clicks=0, className="mb-2"),
 
-                        html.Div(id='output-data-table', className='mb-2')
+                        html.Div("No data submitted yet.", id='output-data-table', className='mb-2')
                     ])
                 ]),
                 dcc.Tab(label='Automation', value='tab-3', children=[
@@ -71,25 +209,25 @@ app.layout = dbc.Container([
                             """, className="tab-content-top-padding text-light"
                         ),
                         dbc.Label("Reading or reviewing long documents", className="text-light"),
-                        dbc.Input(id="input-1", type="number", min=0, placeholder="Hours per week", className="mb-2"),
+                        dbc.Input(id="input-1", type="number", debounce=True, min=0, placeholder="Hours per week", className="mb-2"),
                         
                         dbc.Label("Writing or reading through PowerPoints", className="text-light"),
-                        dbc.Input(id="input-2", type="number", min=0, placeholder="Hours per week", className="mb-2"),
+                        dbc.Input(id="input-2", type="number", debounce=True, min=0, placeholder="Hours per week", className="mb-2"),
 
                         dbc.Label("Writing long texts (blog posts, emails, documents)", className="text-light"),
-                        dbc.Input(id="input-3", type="number", min=0, placeholder="Hours per week", className="mb-2"),
+                        dbc.Input(id="input-3", type="number", debounce=True, min=0, placeholder="Hours per week", className="mb-2"),
 
                         dbc.Label("Scheduling and re-scheduling tasks or events", className="text-light"),
-                        dbc.Input(id="input-4", type="number", min=0, placeholder="Hours per week", className="mb-2"),
+                        dbc.Input(id="input-4", type="number", debounce=True, min=0, placeholder="Hours per week", className="mb-2"),
 
                         dbc.Label("Recording, summarizing, or reviewing meeting notes", className="text-light"),
-                        dbc.Input(id="input-5", type="number", min=0, placeholder="Hours per week", className="mb-2"),
+                        dbc.Input(id="input-5", type="number", debounce=True, min=0, placeholder="Hours per week", className="mb-2"),
                         
                         dbc.Label("Doing repetitive tasks that involve 2 web apps", className="text-light"),
-                        dbc.Input(id="input-6", type="number", min=0, placeholder="Hours per week", className="mb-2"),
+                        dbc.Input(id="input-6", type="number", debounce=True, min=0, placeholder="Hours per week", className="mb-2"),
 
                         dbc.Label("Doing repetitive tasks that involve more than two web apps", className="text-light"),
-                        dbc.Input(id="input-13", type="number", min=0, placeholder="Hours per week", className="mb-2"),
+                        dbc.Input(id="input-13", type="number", debounce=True, min=0, placeholder="Hours per week", className="mb-2"),
 
                         dbc.Button("Submit", id="submit-button", color="primary", n_clicks=0, className="mb-2"),
                     ])
@@ -101,25 +239,25 @@ app.layout = dbc.Container([
                             """, className="tab-content-top-padding text-light"
                         ),
                         dbc.Label("Want to improve the quality of your understanding of long texts", className="text-light"),
-                        dbc.Input(id="input-7", type="number", min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
+                        dbc.Input(id="input-7", type="number", debounce=True, min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
                         
                         dbc.Label("Want to improve the quality of created PowerPoints", className="text-light"),
-                        dbc.Input(id="input-8", type="number", min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
+                        dbc.Input(id="input-8", type="number", debounce=True, min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
 
                         dbc.Label("Want to improve the quality of writing long texts (blog posts, emails, documents)", className="text-light"),
-                        dbc.Input(id="input-9", type="number", min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
+                        dbc.Input(id="input-9", type="number", debounce=True, min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
 
                         dbc.Label("Want to improve the quality of scheduling for tasks or events", className="text-light"),
-                        dbc.Input(id="input-10", type="number", min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
+                        dbc.Input(id="input-10", type="number", debounce=True, min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
 
                         dbc.Label("Want to improve the quality of recordings or summaries of meeting notes", className="text-light"),
-                        dbc.Input(id="input-11", type="number", min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
+                        dbc.Input(id="input-11", type="number", debounce=True, min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
                         
                         dbc.Label("Want to improve the quality of repetetive tasks that involve two web apps", className="text-light"),
-                        dbc.Input(id="input-12", type="number", min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
+                        dbc.Input(id="input-12", type="number", debounce=True, min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
 
                         dbc.Label("Want to improve the quality of repetetive tasks that involve multiple web apps", className="text-light"),
-                        dbc.Input(id="input-14", type="number", min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
+                        dbc.Input(id="input-14", type="number", debounce=True, min=1, max=10, placeholder="Scale of 1-10", className="mb-2"),
 
                         dbc.Button("Submit", id="submit-button-2", color="primary", n_clicks=0, className="mb-2"),
                     ])
@@ -128,265 +266,500 @@ app.layout = dbc.Container([
         ], width=5),
         
         dbc.Col([
-            dcc.Graph(id="bar-graph-1"),
-            dcc.Graph(id="bar-graph-2", className="tab-content-top-padding")
+            dcc.Graph(id="bar-graph-1", figure=AUTO_FIGURE_TEMPLATE),
+            dcc.Graph(id="bar-graph-2", figure=QUALITY_FIGURE_TEMPLATE, className="tab-content-top-padding"),
+            dcc.Graph(id="sweep-graph", figure=SWEEP_FIGURE_TEMPLATE, className="tab-content-top-padding")
         ], width=7)
-    ])
+    ]),
+    # Latest recommendation, shared by the chart and report callbacks
+    dcc.Store(id='recommendation'),
+    # Key of this browser tab's state in the server-side session store, when it is enabled
+    dcc.Store(id='session-id', storage_type='session'),
+    # With server-side sessions: the latest change of an answer, the version of each answer the
+    # browser holds, a store the saves target so button presses wait for them, and a request to
+    # save every answer again when the session is missing some
+    dcc.Store(id='answer-change'),
+    dcc.Store(id='answer-versions'),
+    dcc.Store(id='answers-saved'),
+    dcc.Store(id='session-resync')
 ], fluid=True)
 
-@app.callback(
-    [Output("bar-graph-1", "figure"),
-     Output("bar-graph-2", "figure"),
-     Output('output-data-table', 'children'),
-     Output('error-message', 'children')],
-    [Input("submit-button", "n_clicks"), Input("submit-button-2", "n_clicks"),
-     Input("submit-button-3", "n_clicks"), Input("generate-report-1", "n_clicks")],
-    [dash.dependencies.State("input-1", "value"), dash.dependencies.State("input-2", "value"), 
-     dash.dependencies.State("input-3", "value"), dash.dependencies.State("input-4", "value"),
-     dash.dependencies.State("input-5", "value"), dash.dependencies.State("input-6", "value"),
-     dash.dependencies.State("input-7", "value"), dash.dependencies.State("input-8", "value"),
-     dash.dependencies.State("input-9", "value"), dash.dependencies.State("input-10", "value"),
-     dash.dependencies.State("input-11", "value"), dash.dependencies.State("input-12", "value"),
-     dash.dependencies.State("input-13", "value"), dash.dependencies.State("input-14", "value"),
-     dash.dependencies.State("budget", "value"), dash.dependencies.State("budget", "value"),
-     dash.dependencies.State('checkbox', 'value')]
+# Selection backend, and an optional process pool for solvers that are slow to run in the request thread
+RANKER_SOLVER = os.environ.get('RANKER_SOLVER', 'frontier')
+RANKER_OBJECTIVE = os.environ.get('RANKER_OBJECTIVE', 'automation')
+RANKER_QUALITY_WEIGHT = float(os.environ.get('RANKER_QUALITY_WEIGHT', 0.5))
+solver_executor = None
+if int(os.environ.get('SOLVER_POOL_SIZE', 0)):
+    from executor import SolverExecutor
+    solver_executor = SolverExecutor(
+        max_workers=int(os.environ['SOLVER_POOL_SIZE']),
+        max_pending=int(os.environ.get('SOLVER_POOL_QUEUE', 0)) or None,
+        timeout=float(os.environ.get('SOLVER_TIMEOUT', 2)),
+    )
+
+# Cache of computed recommendations, optionally shared between workers through a SQLite file
+recommendation_cache = RecommendationCache(
+    maxsize=int(os.environ.get('RECOMMENDATION_CACHE_SIZE', 512)),
+    ttl=float(os.environ.get('RECOMMENDATION_CACHE_TTL', 600)),
+    backend=SQLiteBackend(os.environ['RECOMMENDATION_CACHE_DB'], max_rows=int(os.environ.get('RECOMMENDATION_CACHE_DB_SIZE', 100000))) if os.environ.get('RECOMMENDATION_CACHE_DB') else None,
 )
-def update_output(*args):
-    ctx = dash.callback_context
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
-
-    # Initialize custom layout
-    custom_layout = {
-        'height': 650,
-        'plot_bgcolor': '#288cb4',
-        'paper_bgcolor': '#002b36',
-        'font': {'color': '#ffffff'},
-        'title': {'x': 0.5},
-        'xaxis': {'showgrid': False, 'gridcolor': '#666666'},
-        'yaxis': {'showgrid': False, 'gridcolor': '#666666'}
+
+# Optional server-side sessions: the browser sends each answer once, when it changes, and button
+# presses carry only the session id instead of every answer. Needs SESSION_STORE_DB (or a single
+# worker) when several workers serve the app, so that all of them see the same sessions.
+session_store = SessionStore(
+    maxsize=int(os.environ.get('SESSION_STORE_SIZE', 1024)),
+    ttl=float(os.environ.get('SESSION_STORE_TTL', 3600)),
+    backend=SQLiteBackend(os.environ['SESSION_STORE_DB'], max_rows=int(os.environ.get('SESSION_STORE_DB_SIZE', 100000))) if os.environ.get('SESSION_STORE_DB') else None,
+) if os.environ.get('SESSION_STORE', '0').lower() in ('1', 'true', 'yes') or os.environ.get('SESSION_STORE_DB') else None
+
+# One RankerSession per browser tab in each worker, so a re-submit with a few answers changed only
+# re-ranks what changed. They stay in process memory: a request that another worker serves simply
+# starts a session there.
+ranker_sessions = SessionStore(
+    maxsize=int(os.environ.get('SESSION_STORE_SIZE', 1024)),
+    ttl=float(os.environ.get('SESSION_STORE_TTL', 3600)),
+)
+ranker_sessions_lock = threading.Lock()
+
+
+def checkout_ranker(session_id):
+    # The tab's RankerSession, taken out while one request uses it; a concurrent request of the
+    # same tab gets a new one instead of sharing it
+    with ranker_sessions_lock:
+        ranker = ranker_sessions.get(session_id).get('ranker')
+        if ranker is not None:
+            ranker_sessions.update(session_id, ranker=None)
+    return ranker or RankerSession(solver=RANKER_SOLVER, executor=solver_executor)
+
+
+def refine_auto_bar(df):
+    df = df[df['selected']]
+    # Initialize an empty list to store the indices of the rows to keep
+    keep_indices = []
+
+    # Group the DataFrame by 'Task'
+    grouped = df.groupby('Task')
+
+    for _, group in grouped:
+        if len(group) == 1:
+            # If there's only one entry for the task, keep it
+            keep_indices.append(group.index[0])
+        else:
+            # If there are multiple entries for the task
+            # Filter entries where 'Hours saved' > 0
+            positive_hours_saved = group[group['Hours saved'] > 0]
+
+            if not positive_hours_saved.empty:
+                # If there are entries with 'Hours saved' > 0, keep the first one
+                keep_indices.append(positive_hours_saved.index[0])
+            else:
+                # If all entries have 'Hours saved' <= 0, keep the first one
+                keep_indices.append(group.index[0])
+
+    # Create a new DataFrame with only the selected indices
+    refined_df = df.loc[keep_indices].reset_index(drop=True)
+
+    # Adding aggregate row
+    refined_df = refined_df.append({'Task': 'Total',
+        'Hours saved': df['Hours saved'].sum(),
+        'Remaining hours': df['Remaining hours'].sum()},
+        ignore_index=True)
+
+    return refined_df
+
+
+def refine_quality_bar(df, task_order):
+    df = df[df['selected']]
+    df['Task'] = pd.Categorical(df['Task'], categories=task_order, ordered=True)
+    df.sort_values('Task', inplace=True)  # Ensure the DataFrame is sorted after categorization
+    return df[['Quality Score', 'Service', 'Task']]
+
+
+def build_recommendation(budget, automation_vals, quality_vals, copilot, session_id=None):
+    """
+    Rank services for one set of answers and build everything the outputs need:
+    the data of both graphs and the rows of the report table.
+    With a session_id, the tab's RankerSession re-ranks incrementally from its last submit.
+    """
+    if session_id and RANKER_OBJECTIVE == 'automation':
+        ranker = checkout_ranker(session_id)
+        try:
+            ranked_df = ranker.rank(budget, automation_vals, quality_vals, copilot)
+            sweep = ranker.budget_sweep()
+        finally:
+            ranker_sessions.update(session_id, ranker=ranker)
+    else:
+        with METRICS.span('ranker_init'):
+            ranker = Ranker(budget, automation_vals, quality_vals, copilot, solver=RANKER_SOLVER, executor=solver_executor,
+                            objective=RANKER_OBJECTIVE, quality_weight=RANKER_QUALITY_WEIGHT)
+        ranked_df = ranker.rank()
+        sweep = ranker.budget_sweep()
+    # Hours saved at every budget, shown in the budget the user enters (which includes the Copilot bundle)
+    bundle = COPILOT_PRICE if copilot else 0
+
+    with METRICS.span('post_process'):
+        ranked_df['Remaining hours'] = ranked_df['Hours spent'] - ranked_df['Hours saved']
+        ranked_df.loc[ranked_df['selected'] == 0, 'Remaining hours'] = 0
+
+        ranked_df['Hours saved'] = ranked_df['Hours saved'].apply(partial(round, ndigits=2))
+        ranked_df['Remaining hours'] = ranked_df['Remaining hours'].apply(partial(round, ndigits=2))
+
+        auto_bar = ranked_df[['Task', 'Hours saved', 'Remaining hours', 'selected']]
+        qual_bar = ranked_df[['Service', 'Quality Score', 'selected', 'Task']]
+
+        auto_ready = refine_auto_bar(auto_bar)
+        qual_ready = refine_quality_bar(qual_bar, task_order=auto_ready['Task'].values)
+
+        df = ranked_df[['Service', 'Hours saved', 'Remaining hours', 'Quality Score', 'selected']]
+        df = df[df['selected']].drop('selected', axis=1)
+
+    # Plain lists of the chart data; figures are patched from these
+    return {
+        'auto_chart': {column: auto_ready[column].tolist() for column in DEFAULT_AUTO_CHART},
+        'quality_chart': {column: qual_ready[column].tolist() for column in DEFAULT_QUALITY_CHART},
+        'sweep_chart': {
+            'Budget': (sweep['Budget'] + bundle).tolist(),
+            'Hours saved': sweep['Hours saved'].round(2).tolist(),
+            'Your budget': [budget + bundle],
+            'Your hours saved': [round(ranked_df.loc[ranked_df['selected'], 'Hours saved'].sum(), 2)],
+        },
+        'report': df.to_dict('records'),
+        'report_columns': list(df.columns),
+        # False when the solver pool was overloaded and answered greedily
+        'exact': ranker.exact,
     }
 
-    # Initialize default data for graphs
-    default_data_auto = pd.DataFrame({"Task": ["Reading texts", "PowerPoint", "Writing", "Scheduling", "Meetings", "Web apps (2-step)", "Web apps (multi-step)", "Total"], "Hours saved": [0]*8, "Remaining hours": [0]*8})
-    default_data_qual = pd.DataFrame({"Service": ["A"], "Quality": [0]})
-
-    # Initialize graphs with default data
-    fig1 = px.bar(default_data_auto, x="Task", y=["Hours saved", "Remaining hours"], title="Time Saved", labels={"value": "Total Hours"})
-    fig1.update_layout(**custom_layout)
-    fig1.update_traces(marker=dict(line=dict(width=0)), texttemplate='%{y}', textposition='inside')
-    fig1.update_layout(legend_title_text='', transition={'duration': 500}, title={'text': "Time Saved (Hours)", 'y':0.95, 'font': dict(
-            family="Helvetica",  # Specify the font family if needed
-            size=24,  # Adjust the size as needed
-            color="white"  # Adjust the color if needed
-        )}, xaxis_title_standoff=1)
-
-    fig2 = px.bar(default_data_qual, x="Service", y="Quality", labels={"Service": "Recommended Service"})
-    fig2.update_layout(**custom_layout)
-    fig2.update_layout(title={'text': "Quality Scores (1-10)", 'y':1.0, 'font': dict(
-            family="Helvetica",  # Specify the font family if needed
-            size=24,  # Adjust the size as needed
-            color="white"  # Adjust the color if needed
-        )})
-
-    default_report = 'Nothing to show'
-
-    # Return early if no button was pressed yet
-    if not ctx.triggered:
-        return fig1, fig2, "No data submitted yet.", " "
-
-    # Handling form inputs and button press
-    keys = ["input-" + str(num) + ".value" for num in range(1,13)]
-    input_n = [ctx.states[key] for key in keys]
-    automation_vals, quality_vals = input_n[:len(input_n)//2], input_n[len(input_n)//2:]
-    automation_vals.append(ctx.states["input-13.value"])
-    quality_vals.append(ctx.states["input-14.value"])
 
+def report_table(records, columns):
+    return dash_table.DataTable(
+        data=records,
+        columns=[{"name": i, "id": i} for i in columns],
+        style_table={
+            'overflowX': 'auto',
+            'width': '100%',  # Ensure the table uses the full width of its container
+            'minWidth': '100%'
+        },
+        page_size=10,  # Add pagination
+        page_action='native',  # Enables server-side pagination
+        style_cell={
+            'overflow': 'hidden',
+            'textOverflow': 'ellipsis',
+            'maxWidth': 0,
+            'padding': '10px',  # Add padding for content inside cells for better readability
+            'backgroundColor': '#343a40',  # Dark background for each cell
+            'color': '#f8f9fa',  # Light text for readability
+            'border': '1px solid #444'  # Slightly lighter border for subtle contrast
+        },
+        style_header={
+            'backgroundColor': '#495057',  # Slightly lighter than cell background for distinction
+            'fontWeight': 'bold',
+            'color': '#f8f9fa',  # White text color for the header
+            'border': '1px solid #444'
+        },
+        style_data={  # Style for the table's data cells
+            'border': '1px solid #444',
+            'backgroundColor': '#343a40',  # Same as cell background for consistency
+            'color': '#f8f9fa'
+        },
+        style_as_list_view=True,  # Styles the table like a list view without vertical grid lines
+    )
+
+
+# Metrics endpoint and cache gauges, only when ENABLE_METRICS is set
+METRICS.register(app.server)
+METRICS.gauge('cache_hits', 'Recommendation cache hits', lambda: recommendation_cache.stats()['hits'])
+METRICS.gauge('cache_misses', 'Recommendation cache misses', lambda: recommendation_cache.stats()['misses'])
+METRICS.gauge('cache_hit_rate', 'Recommendation cache hit rate', lambda: recommendation_cache.stats()['hit_rate'])
+METRICS.gauge('cache_size', 'Recommendations held in the cache', lambda: recommendation_cache.stats()['size'])
+
+# Cohort export endpoint, only when ENABLE_EXPORT is set
+if os.environ.get('ENABLE_EXPORT', '0').lower() in ('1', 'true', 'yes'):
+    import export
+    export.register(app.server, chunk_size=int(os.environ.get('EXPORT_CHUNK_SIZE', export.CHUNK_SIZE)))
+
+
+# Buttons whose press refreshes each output
+AUTO_CHART_BUTTONS = ["submit-button", "submit-button-3"]
+QUALITY_CHART_BUTTONS = ["submit-button", "submit-button-2", "submit-button-3"]
+SWEEP_CHART_BUTTONS = ["submit-button", "submit-button-3"]
+REPORT_BUTTONS = ["generate-report-1"]
+
+
+# Answer inputs, in the order Ranker takes them
+AUTOMATION_INPUTS = ["input-1", "input-2", "input-3", "input-4", "input-5", "input-6", "input-13"]
+QUALITY_INPUTS = ["input-7", "input-8", "input-9", "input-10", "input-11", "input-12", "input-14"]
+RECOMMENDATION_BUTTONS = ["submit-button", "submit-button-2", "submit-button-3", "generate-report-1"]
+ANSWER_FIELDS = AUTOMATION_INPUTS + QUALITY_INPUTS + ["budget", "checkbox"]
+
+
+def recommend(automation_vals, quality_vals, budget, checkbox_checked, stored, log_fields, session_id=None):
+    """
+    Validate the answers and compute their recommendation.
+    Returns (key, recommendation, error_message); recommendation is None when the answers are
+    invalid or the 'recommendation' store data shows the caller already holds the exact
+    recommendation for them.
+    """
     # Validation logic
-    budget = ctx.states['budget.value']
-    checkbox_checked = ctx.states['checkbox.value']
-    error_message = " "
-    if checkbox_checked and (budget is None or budget < 20):
-        error_message = "If Copilot is enabled, the budget must be at least $20."
-        return fig1, fig2, "No data to display.", error_message
+    if budget is None:
+        log_fields['error'] = 'missing_budget'
+        return None, None, "Please enter a budget."
+
+    if checkbox_checked and budget < COPILOT_PRICE:
+        log_fields['error'] = 'copilot_budget'
+        return None, None, f"If Copilot is enabled, the budget must be at least ${COPILOT_PRICE}."
 
     elif checkbox_checked:
-        budget -= 20
+        budget -= COPILOT_PRICE
+
+    # Nothing to recompute when the stored recommendation was made from the same inputs
+    key = normalize_key(automation_vals, quality_vals, budget, checkbox_checked)
+    if stored.get('exact', True) and stored.get('key') == json.loads(json.dumps(key)):
+        log_fields['cache'] = 'store'
+        return key, None, " "
+
+    # Process data, reusing the result when the same answers were ranked before
+    with METRICS.span('cache_lookup'):
+        recommendation = recommendation_cache.get(key)
+    log_fields['cache'] = 'miss' if recommendation is None else 'hit'
+    if recommendation is None:
+        recommendation = build_recommendation(budget, automation_vals, quality_vals, checkbox_checked, session_id)
+        # A greedy fallback is only good for this request; the next one should get the solver's answer
+        if recommendation['exact']:
+            recommendation_cache.set(key, recommendation)
+        else:
+            log_fields['solver'] = 'fallback'
+    return key, recommendation, " "
+
+
+@app.callback(Output('session-id', 'data'), Input('session-id', 'data'))
+def assign_session(session_id):
+    # A new id for each browser tab; it survives reloads through session storage
+    if session_id:
+        raise PreventUpdate
+    return uuid.uuid4().hex
+
+
+if session_store is None:
+    @app.callback(
+        [Output('recommendation', 'data'),
+         Output('error-message', 'children')],
+        [Input(button, "n_clicks") for button in RECOMMENDATION_BUTTONS],
+        [State(field, "value") for field in AUTOMATION_INPUTS + QUALITY_INPUTS] +
+        [State("budget", "value"), State('checkbox', 'value'), State('recommendation', 'data'), State('session-id', 'data')],
+        prevent_initial_call=True
+    )
+    def update_recommendation(*args):
+        """
+        Validate the inputs and compute the recommendation once per change of inputs.
+        The chart and table callbacks read it from the 'recommendation' store.
+        """
+        ctx = dash.callback_context
+        button_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
+
+        with METRICS.request(button_id) as log_fields:
+            automation_vals = [ctx.states[f"{field}.value"] for field in AUTOMATION_INPUTS]
+            quality_vals = [ctx.states[f"{field}.value"] for field in QUALITY_INPUTS]
+            stored = ctx.states['recommendation.data'] or {}
+            key, recommendation, error_message = recommend(
+                automation_vals, quality_vals, ctx.states['budget.value'], ctx.states['checkbox.value'],
+                stored, log_fields, ctx.states['session-id.data'])
+            if key is None:
+                return {'error': error_message}, error_message
+            if recommendation is None:
+                return no_update, error_message
+            return {'key': key, **recommendation}, error_message
+
+else:
+    # Number each change of an answer in the browser, so the server can tell whether the session
+    # holds the latest version of every answer
+    app.clientside_callback(
+        """
+        function() {
+            const versions = Object.assign({}, arguments[arguments.length - 1]);
+            const change = {};
+            let version = Math.max(0, ...Object.values(versions));
+            for (const trigger of dash_clientside.callback_context.triggered) {
+                const field = trigger.prop_id.split('.')[0];
+                versions[field] = ++version;
+                change[field] = [trigger.value === undefined ? null : trigger.value, version];
+            }
+            return [change, versions];
+        }
+        """,
+        [Output('answer-change', 'data'), Output('answer-versions', 'data')],
+        [Input(field, 'value') for field in ANSWER_FIELDS],
+        State('answer-versions', 'data'),
+        prevent_initial_call=True
+    )
+
+    def version_field(field):
+        # Session field holding the version of the saved answer to field
+        return f'{field}.version'
+
+    @app.callback(
+        Output('answers-saved', 'data'),
+        Input('answer-change', 'data'), State('session-id', 'data'),
+        prevent_initial_call=True
+    )
+    def remember_answers(change, session_id):
+        # Save the changed answers and their versions in the session, with no response body.
+        # update_recommendation takes 'answers-saved' as an input, so Dash holds a button press
+        # until the saves before it have returned.
+        if session_id and change:
+            session_store.update(session_id, **{field: value for field, (value, _) in change.items()},
+                                 **{version_field(field): version for field, (_, version) in change.items()})
+        raise PreventUpdate
+
+    def session_recommendation(session_id, session, stored, log_fields):
+        # The recommendation for the answers saved in the session, kept there; the 'recommendation'
+        # store only carries its key
+        if 'recommendation' not in session:
+            stored = {}
+        key, recommendation, error_message = recommend(
+            [session.get(field) for field in AUTOMATION_INPUTS], [session.get(field) for field in QUALITY_INPUTS],
+            session.get('budget'), session.get('checkbox'), stored, log_fields, session_id)
+        if key is None:
+            return {'error': error_message}, error_message
+        if recommendation is None:
+            return no_update, error_message
+        session_store.update(session_id, recommendation=recommendation)
+        return {'key': key, 'exact': recommendation.get('exact', True)}, error_message
+
+    @app.callback(
+        [Output('recommendation', 'data'),
+         Output('error-message', 'children'),
+         Output('session-resync', 'data')],
+        [Input(button, "n_clicks") for button in RECOMMENDATION_BUTTONS] + [Input('answers-saved', 'data')],
+        [State('session-id', 'data'), State('recommendation', 'data'), State('answer-versions', 'data')],
+        prevent_initial_call=True
+    )
+    def update_recommendation(*args):
+        """
+        Compute the recommendation from the answers saved in the session.
+        When the session lacks the latest version of an answer (it expired, or a save was lost),
+        ask resync_session to compute it from the inputs instead.
+        """
+        ctx = dash.callback_context
+        button_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
+
+        with METRICS.request(button_id) as log_fields:
+            session_id = ctx.states['session-id.data']
+            session = session_store.get(session_id)
+            versions = ctx.states['answer-versions.data'] or {}
+            if not session_id or any(session.get(version_field(field)) != versions.get(field) for field in ANSWER_FIELDS):
+                log_fields['session'] = 'stale'
+                return no_update, no_update, {'button': button_id, 'request': uuid.uuid4().hex}
+            return (*session_recommendation(session_id, session, ctx.states['recommendation.data'] or {}, log_fields),
+                    no_update)
+
+    @app.callback(
+        [Output('recommendation', 'data', allow_duplicate=True),
+         Output('error-message', 'children', allow_duplicate=True)],
+        Input('session-resync', 'data'),
+        [State(field, "value") for field in ANSWER_FIELDS] +
+        [State('session-id', 'data'), State('recommendation', 'data'), State('answer-versions', 'data')],
+        prevent_initial_call=True
+    )
+    def resync_session(resync, *args):
+        """
+        Save every answer in the session again, then compute the recommendation from them.
+        The chart and table callbacks wait for it, since it writes the 'recommendation' store.
+        """
+        ctx = dash.callback_context
+
+        with METRICS.request(resync['button']) as log_fields:
+            log_fields['session'] = 'resync'
+            session_id = ctx.states['session-id.data']
+            versions = ctx.states['answer-versions.data'] or {}
+            answers = {field: ctx.states[f"{field}.value"] for field in ANSWER_FIELDS}
+            if not session_id:
+                error_message = "Your session is not ready yet, please try again."
+                return {'error': error_message}, error_message
+            session = session_store.update(session_id, **answers,
+                                           **{version_field(field): versions.get(field) for field in ANSWER_FIELDS})
+            return session_recommendation(session_id, session, ctx.states['recommendation.data'] or {}, log_fields)
+
+def stored_recommendation(recommendation, session_id):
+    # The full recommendation, from the session when the store only carries its key
+    if session_store is None or 'error' in recommendation:
+        return recommendation
+    return session_store.get(session_id).get('recommendation')
+
+
+def pressed(ctx, buttons):
+    # Whether one of buttons is among the inputs that fired this callback
+    return any(prop['prop_id'].split('.')[0] in buttons for prop in ctx.triggered)
 
-    # Process data and update graphs as necessary
-    ranker = Ranker(budget, automation_vals, quality_vals, checkbox_checked)
-    ranked_df = ranker.rank()
 
-    # if button_id in ["submit-button"]:
-    #     # Using `reset_index(drop=True)` to ignore the original index
-    #     assert 1==0, f"Ranker df: {ranked_df}"
+@app.callback(
+    Output("bar-graph-1", "figure"),
+    [Input('recommendation', 'data')] + [Input(button, "n_clicks") for button in AUTO_CHART_BUTTONS],
+    State('session-id', 'data'),
+    prevent_initial_call=True
+)
+def update_auto_chart(recommendation, *clicks_and_session):
+    ctx = dash.callback_context
+    if not recommendation:
+        return no_update
+    if 'error' in recommendation:
+        return auto_patch(DEFAULT_AUTO_CHART)
+    if not pressed(ctx, AUTO_CHART_BUTTONS):
+        return no_update
+    return auto_patch(stored_recommendation(recommendation, clicks_and_session[-1])['auto_chart'])
 
-    ranked_df['Remaining hours'] = ranked_df['Hours spent'] - ranked_df['Hours saved']
-    ranked_df.loc[ranked_df['selected'] == 0, 'Remaining hours'] = 0
 
-    ranked_df['Hours saved'] = ranked_df['Hours saved'].apply(partial(round, ndigits=2))
-    ranked_df['Remaining hours'] = ranked_df['Remaining hours'].apply(partial(round, ndigits=2))
-    
+@app.callback(
+    Output("bar-graph-2", "figure"),
+    [Input('recommendation', 'data')] + [Input(button, "n_clicks") for button in QUALITY_CHART_BUTTONS],
+    State('session-id', 'data'),
+    prevent_initial_call=True
+)
+def update_quality_chart(recommendation, *clicks_and_session):
+    ctx = dash.callback_context
+    if not recommendation:
+        return no_update
+    if 'error' in recommendation:
+        return quality_patch(DEFAULT_QUALITY_CHART)
+    if not pressed(ctx, QUALITY_CHART_BUTTONS):
+        return no_update
+    return quality_patch(stored_recommendation(recommendation, clicks_and_session[-1])['quality_chart'])
 
-    auto_bar = ranked_df[['Task', 'Hours saved', 'Remaining hours', 'selected']]
-    qual_bar = ranked_df[['Service', 'Quality Score', 'selected', 'Task']]
 
-    def refine_auto_bar(df):
-        df = df[df['selected']]
-        # Initialize an empty list to store the indices of the rows to keep
-        keep_indices = []
-        
-        # Group the DataFrame by 'Task'
-        grouped = df.groupby('Task')
-        
-        for _, group in grouped:
-            if len(group) == 1:
-                # If there's only one entry for the task, keep it
-                keep_indices.append(group.index[0])
-            else:
-                # If there are multiple entries for the task
-                # Filter entries where 'Hours saved' > 0
-                positive_hours_saved = group[group['Hours saved'] > 0]
-                
-                if not positive_hours_saved.empty:
-                    # If there are entries with 'Hours saved' > 0, keep the first one
-                    keep_indices.append(positive_hours_saved.index[0])
-                else:
-                    # If all entries have 'Hours saved' <= 0, keep the first one
-                    keep_indices.append(group.index[0])
-        
-        # Create a new DataFrame with only the selected indices
-        refined_df = df.loc[keep_indices].reset_index(drop=True)
-
-        # Adding aggregate row
-        refined_df = refined_df.append({'Task': 'Total',
-            'Hours saved': df['Hours saved'].sum(),
-            'Remaining hours': df['Remaining hours'].sum()},
-            ignore_index=True)
-        
-        
-        
-        return refined_df
-    
-    auto_ready = refine_auto_bar(auto_bar)
+@app.callback(
+    Output("sweep-graph", "figure"),
+    [Input('recommendation', 'data')] + [Input(button, "n_clicks") for button in SWEEP_CHART_BUTTONS],
+    State('session-id', 'data'),
+    prevent_initial_call=True
+)
+def update_sweep_chart(recommendation, *clicks_and_session):
+    ctx = dash.callback_context
+    if not recommendation:
+        return no_update
+    if 'error' in recommendation:
+        return sweep_patch(DEFAULT_SWEEP_CHART)
+    if not pressed(ctx, SWEEP_CHART_BUTTONS):
+        return no_update
+    return sweep_patch(stored_recommendation(recommendation, clicks_and_session[-1])['sweep_chart'])
 
-        
-    def refine_quality_bar(df, task_order=auto_ready['Task'].values):
-        df = df[df['selected']]
-        df['Task'] = pd.Categorical(df['Task'], categories=task_order, ordered=True)
-        df.sort_values('Task', inplace=True)  # Ensure the DataFrame is sorted after categorization
-        return df[['Quality Score', 'Service', 'Task']]
-
-
-    qual_ready = refine_quality_bar(qual_bar)
-
-    default_report = "No data to show"
-
-    if button_id in ["submit-button"]:
-        # Update the data in the figure
-        # Using `reset_index(drop=True)` to ignore the original index
-        fig1 = px.bar(auto_ready, x="Task", y=["Hours saved", "Remaining hours"], title="Time Saved", labels={"value": "Total Hours"})
-        fig1.update_traces(marker=dict(line=dict(width=0)), texttemplate='%{y}', textposition='inside')
-        fig1.update_layout(**custom_layout, legend_title_text='')
-        fig1.update_layout(legend_title_text='', transition={'duration': 500}, title={'text': "Time Saved (Hours)", 'y':0.95, 'font': dict(
-                family="Helvetica",  # Specify the font family if needed
-                size=24,  # Adjust the size as needed
-                color="white"  # Adjust the color if needed
-            )})
-        # Code for un-centering the title
-        #   fig1.update_layout(
-        #                     legend_title_text="",
-        #                     yaxis_title="Total Hours",
-        #                     title={
-        #                         'text': 'Your Graph Title',
-        #                         'x':0.45,  # Adjust this value to shift the title left (<0.5) or right (>0.5)
-        #                         'xanchor': 'center',  # Ensures the title will still center at the new x position
-        #                         'yanchor': 'top'
-        #                     }
-        #                 )
-        fig2 = px.bar(qual_ready, x="Service", y="Quality Score", labels={"Service": "Recommended Service"})
-        fig2.update_layout(**custom_layout)
-        fig2.update_layout(title={'text': "Quality Scores  (1-10)", 'y':1.0, 'font': dict(
-                family="Helvetica",  # Specify the font family if needed
-                size=24,  # Adjust the size as needed
-                color="white"  # Adjust the color if needed
-            )})
-        return fig1, fig2, no_update, error_message
-    elif button_id in ["submit-button-2"]:
-        fig2 = px.bar(qual_ready, x="Service", y="Quality Score", labels={"Service": "Recommended Service"})
-        fig2.update_layout(**custom_layout)
-        fig2.update_layout(title={'text': "Quality Scores  (1-10)", 'y':1.0, 'font': dict(
-                family="Helvetica",  # Specify the font family if needed
-                size=24,  # Adjust the size as needed
-                color="white"  # Adjust the color if needed
-            )})
-        return no_update, fig2, no_update, error_message
-    elif button_id in ['generate-report-1']:
-        df = ranked_df[['Service', 'Hours saved', 'Remaining hours', 'Quality Score', 'selected']]
-        df = df[df['selected']]
-        df.drop('selected', axis=1, inplace=True)
-        default_report = dash_table.DataTable(
-            data=df.to_dict('records'),
-            columns=[{"name": i, "id": i} for i in df.columns],
-            style_table={
-                'overflowX': 'auto',
-                'width': '100%',  # Ensure the table uses the full width of its container
-                'minWidth': '100%'
-            },
-            page_size=10,  # Add pagination
-            page_action='native',  # Enables server-side pagination
-            style_cell={
-                'overflow': 'hidden',
-                'textOverflow': 'ellipsis',
-                'maxWidth': 0,
-                'padding': '10px',  # Add padding for content inside cells for better readability
-                'backgroundColor': '#343a40',  # Dark background for each cell
-                'color': '#f8f9fa',  # Light text for readability
-                'border': '1px solid #444'  # Slightly lighter border for subtle contrast
-            },
-            style_header={
-                'backgroundColor': '#495057',  # Slightly lighter than cell background for distinction
-                'fontWeight': 'bold',
-                'color': '#f8f9fa',  # White text color for the header
-                'border': '1px solid #444'
-            },
-            style_data={  # Style for the table's data cells
-                'border': '1px solid #444',
-                'backgroundColor': '#343a40',  # Same as cell background for consistency
-                'color': '#f8f9fa'
-            },
-            style_as_list_view=True,  # Styles the table like a list view without vertical grid lines
-        )
-
-        return no_update, no_update, default_report, no_update
-    
-    else:
-        fig1 = px.bar(auto_ready, x="Task", y=["Hours saved", "Remaining hours"], title="Time Saved", labels={"value": "Total Hours"})
-        fig1.update_traces(marker=dict(line=dict(width=0)), texttemplate='%{y}', textposition='inside')
-        fig1.update_layout(**custom_layout, legend_title_text='')
-        fig1.update_layout(legend_title_text='', transition={'duration': 500}, title={'text': "Time Saved (Hours)", 'y':0.95, 'font': dict(
-                family="Helvetica",  # Specify the font family if needed
-                size=24,  # Adjust the size as needed
-                color="white"  # Adjust the color if needed
-            )})
-        # Code for un-centering the title
-        #   fig1.update_layout(
-        #                     legend_title_text="",
-        #                     yaxis_title="Total Hours",
-        #                     title={
-        #                         'text': 'Your Graph Title',
-        #                         'x':0.45,  # Adjust this value to shift the title left (<0.5) or right (>0.5)
-        #                         'xanchor': 'center',  # Ensures the title will still center at the new x position
-        #                         'yanchor': 'top'
-        #                     }
-        #                 )
-        fig2 = px.bar(qual_ready, x="Service", y="Quality Score", title="Quality Scores (1-10)", labels={"Service": "Recommended Service"})
-        fig2.update_layout(**custom_layout)
-        fig2.update_layout(title={'text': "Quality Scores (1-10)", 'y':1.0, 'font': dict(
-                family="Helvetica",  # Specify the font family if needed
-                size=24,  # Adjust the size as needed
-                color="white"  # Adjust the color if needed
-            )})
-        return fig1, fig2, no_update, error_message
+
+@app.callback(
+    Output('output-data-table', 'children'),
+    [Input('recommendation', 'data')] + [Input(button, "n_clicks") for button in REPORT_BUTTONS],
+    State('session-id', 'data'),
+    prevent_initial_call=True
+)
+def update_report(recommendation, *clicks_and_session):
+    ctx = dash.callback_context
+    if not recommendation:
+        return no_update
+    if 'error' in recommendation:
+        return "No data to display."
+    if not pressed(ctx, REPORT_BUTTONS):
+        return no_update
+    recommendation = stored_recommendation(recommendation, clicks_and_session[-1])
+    with METRICS.span('report_table'):
+        return report_table(recommendation['report'], recommendation['report_columns'])
 
 # Run the app
 if __name__ == '__main__':
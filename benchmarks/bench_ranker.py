@@ -0,0 +1,220 @@
+"""
+Micro-benchmarks for the recommendation path, run headless against a fixed corpus of profiles.
+
+    python -m benchmarks.bench_ranker           # compare against benchmarks/baseline.json
+    python -m benchmarks.bench_ranker --save    # record a new baseline on this machine
+
+Each stage is timed over the whole corpus (fastest of several repeats) and its peak
+allocation is measured with tracemalloc. The run fails when a stage is slower or
+allocates more than its baseline by more than the tolerance. A stage that looks slower
+is measured again, and only fails when every measurement is over the limit, since a
+busy machine can slow one measurement down by more than the tolerance on its own.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+from app import (
+    DEFAULT_AUTO_CHART, DEFAULT_QUALITY_CHART, auto_figure, auto_patch, build_recommendation, quality_figure,
+    quality_patch, refine_auto_bar, refine_quality_bar, report_table, sweep_figure, sweep_patch,
+)
+from ranker import Ranker, RankerSession
+from solvers import SOLVERS, ParetoFrontier
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Budgets on and around the price breakpoints of the catalog
+BUDGETS = [0, 7, 8, 12, 19, 20, 27, 39, 71, 100]
+ANSWERS = {
+    'zero': ([0] * 7, [0] * 7),
+    'none': ([None] * 7, [None] * 7),
+    'typical': ([2, 3, 8, 2, 4, 1, 1], [5, 7, 9, 3, 6, 2, 2]),
+    'heavy': ([10, 8, 15, 6, 12, 5, 5], [10, 10, 10, 10, 10, 10, 10]),
+}
+
+
+def corpus():
+    # (budget, automation answers, quality answers, copilot) as update_output passes them to Ranker
+    profiles = []
+    for automation_vals, quality_vals in ANSWERS.values():
+        for copilot in (False, True):
+            for budget in BUDGETS:
+                profiles.append((budget, automation_vals, quality_vals, copilot))
+    return profiles
+
+
+def edits(profiles):
+    # Each profile followed by the single-field re-submits a user makes while filling in the tabs
+    sequences = []
+    for budget, automation_vals, quality_vals, copilot in profiles:
+        quality_edit = list(quality_vals)
+        quality_edit[0] = 0 if quality_edit[0] else 5
+        automation_edit = list(automation_vals)
+        automation_edit[-1] = 0 if automation_edit[-1] else 5
+        sequences.append([
+            (budget, automation_vals, quality_vals, copilot),
+            (budget, automation_vals, quality_edit, copilot),
+            (budget + 1, automation_vals, quality_edit, copilot),
+            (budget + 1, automation_edit, quality_edit, copilot),
+        ])
+    return sequences
+
+
+def prepared(profiles):
+    # Inputs for the stages that run after ranking, computed once outside the timed region
+    rows = []
+    for profile in profiles:
+        ranked_df = Ranker(*profile).rank()
+        ranked_df['Remaining hours'] = ranked_df['Hours spent'] - ranked_df['Hours saved']
+        ranked_df.loc[ranked_df['selected'] == 0, 'Remaining hours'] = 0
+        auto_bar = ranked_df[['Task', 'Hours saved', 'Remaining hours', 'selected']]
+        qual_bar = ranked_df[['Service', 'Quality Score', 'selected', 'Task']]
+        auto_ready = refine_auto_bar(auto_bar)
+        qual_ready = refine_quality_bar(qual_bar, task_order=auto_ready['Task'].values)
+        report = ranked_df[ranked_df['selected']][['Service', 'Hours saved', 'Remaining hours', 'Quality Score']]
+        auto_chart = {column: auto_ready[column].tolist() for column in DEFAULT_AUTO_CHART}
+        quality_chart = {column: qual_ready[column].tolist() for column in DEFAULT_QUALITY_CHART}
+        rows.append((auto_bar, qual_bar, auto_ready, auto_chart, quality_chart, report))
+    return rows
+
+
+def stages(profiles):
+    rankers = [Ranker(*profile) for profile in profiles]
+    solve_inputs = []
+    pareto_inputs = []
+    for ranker in rankers:
+        ranked = ranker.rank_services()
+        solve_inputs.append((ranked.automation_stat, ranker.catalog.prices[ranked.index], ranker.catalog.task_index[ranked.index], ranker.budget))
+        pareto_inputs.append((ranked.automation_stat, ranked.quality_stat) + solve_inputs[-1][1:])
+    rows = prepared(profiles)
+    recommendations = [build_recommendation(*profile) for profile in profiles]
+    sequences = edits(profiles)
+
+    def session_edits(solver):
+        def run():
+            for sequence in sequences:
+                session = RankerSession(solver=solver)
+                for profile in sequence:
+                    session.rank_services(*profile)
+        return run
+
+    def solve(name):
+        return lambda: [SOLVERS[name](*args) for args in solve_inputs]
+
+    return {
+        'ranker_init': lambda: [Ranker(*profile) for profile in profiles],
+        'ranker_rank': lambda: [Ranker(*profile).rank() for profile in profiles],
+        # With the knapsack solver, since frontier solves are memoized across the corpus after the warm-up run
+        'ranker_edits': lambda: [Ranker(*profile).rank_services() for sequence in sequences for profile in sequence],
+        'session_edits': session_edits('knapsack'),
+        'budget_sweep': lambda: [ranker.budget_sweep() for ranker in rankers],
+        'solve_pulp': solve('pulp'),
+        'solve_knapsack': solve('knapsack'),
+        'solve_frontier': solve('frontier'),
+        # Uncached, so every profile pays for the Pareto DP
+        'solve_pareto': lambda: [ParetoFrontier(*args) for args in pareto_inputs],
+        'refine_auto_bar': lambda: [refine_auto_bar(row[0]) for row in rows],
+        'refine_quality_bar': lambda: [refine_quality_bar(row[1], task_order=row[2]['Task'].values) for row in rows],
+        'auto_figure': lambda: [auto_figure(row[3]) for row in rows],
+        'quality_figure': lambda: [quality_figure(row[4]) for row in rows],
+        'auto_patch': lambda: [auto_patch(row[3]) for row in rows],
+        'quality_patch': lambda: [quality_patch(row[4]) for row in rows],
+        'sweep_figure': lambda: [sweep_figure(recommendation['sweep_chart']) for recommendation in recommendations],
+        'sweep_patch': lambda: [sweep_patch(recommendation['sweep_chart']) for recommendation in recommendations],
+        'report_table': lambda: [report_table(row[5].to_dict('records'), list(row[5].columns)) for row in rows],
+        'build_recommendation': lambda: [build_recommendation(*profile) for profile in profiles],
+    }
+
+
+def measure(run, repeats, min_time=0.2):
+    # Warm up once so imports and caches are not counted, then time and trace separately.
+    # Fast stages are repeated until they fill min_time, and the fastest run is kept as
+    # the least noisy estimate.
+    start = time.perf_counter()
+    run()
+    repeats = max(repeats, int(min_time / max(time.perf_counter() - start, 1e-9)))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(timings), 'peak_bytes': peak}
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    regressions = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            # Stages faster than min_seconds over the whole corpus are too noisy to compare on time
+            if metric == 'seconds' and result[metric] < min_seconds:
+                continue
+            if result[metric] > baseline[name][metric] * tolerance:
+                regressions.setdefault(name, []).append(
+                    f"{name} {metric}: {result[metric]:.6g} > {tolerance} x baseline {baseline[name][metric]:.6g}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed slowdown factor before failing')
+    parser.add_argument('--min-seconds', type=float, default=0.005, help='ignore timing regressions below this corpus time')
+    parser.add_argument('--only', nargs='*', help='run only these stages')
+    parser.add_argument('--confirm', type=int, default=2, help='times a stage that looks slower is measured again')
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    profiles = corpus()
+    results = {}
+    runs = stages(profiles)
+    for name, run in runs.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(run, args.repeats)
+        per_call = results[name]['seconds'] / len(profiles) * 1e6
+        print(f"{name:22s} {per_call:12.1f} us/profile {results[name]['peak_bytes'] / 1024:10.1f} KiB peak")
+
+    if args.save:
+        # Keep the baselines of stages that were not run this time
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                results = {**json.load(f), **results}
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        # Keep the best measurement of each suspect stage; noise only ever makes a stage slower
+        for name in regressions:
+            result = measure(runs[name], args.repeats)
+            results[name] = {metric: min(results[name][metric], result[metric]) for metric in result}
+        regressions = compare({name: results[name] for name in regressions}, baseline, args.tolerance, args.min_seconds)
+    for messages in regressions.values():
+        for regression in messages:
+            print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Scaling benchmark: selection latency on synthetic catalogs far larger than the shipped one.
+
+    python -m benchmarks.bench_scaling                  # every size, every solver
+    python -m benchmarks.bench_scaling --skip pulp      # leave out the slow reference solver
+    python -m benchmarks.bench_scaling --max-ms 100     # fail when a Ranker call at 500+ services is slower
+    python -m benchmarks.bench_scaling --requires 3 10  # one run with 3 dependencies, one with 10
+
+The ranker, weighted and lexicographic stages time Ranker.rank_services under each objective,
+the sweep stage Ranker.budget_sweep, which the app also runs on every recommendation, and the
+pareto stage the ParetoFrontier behind Ranker.pareto_frontier, built afresh each time.
+
+Each catalog has whole-dollar prices, two optional bundles and a few services that require
+another one (--requires sets how many), and every profile buys its bundles rather than having them prepaid, so the
+constrained solve is what gets timed. Times are per profile, fastest of several repeats.
+"""
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from catalog import Catalog
+from ranker import Ranker, _constraints
+from solvers import SOLVERS, ParetoFrontier
+
+# (services, tasks) of each synthetic catalog
+SIZES = [(11, 7), (50, 7), (100, 20), (250, 20), (500, 40), (1000, 40)]
+BUDGETS = [20, 60, 150]
+N_BUNDLES = 2
+N_REQUIRES = 3
+
+
+def synthetic_catalog(n_services, n_tasks, seed=0, n_requires=N_REQUIRES):
+    rng = np.random.default_rng(seed)
+    tasks = [f"Task {t}" for t in range(n_tasks)]
+    bundles = [{'name': f"Bundle {b}", 'price': int(rng.integers(10, 30))} for b in range(N_BUNDLES)]
+    services = []
+    for s in range(n_services):
+        # Every task gets a service before any gets a second one
+        task = s if s < n_tasks else int(rng.integers(n_tasks))
+        in_bundle = rng.random() < 0.1
+        services.append({
+            'name': f"Service {s}",
+            'task': tasks[task],
+            'price': 0 if in_bundle else int(rng.choice([0, 5, 8, 10, 12, 15, 20, 30, 45])),
+            'auto_score': int(rng.integers(1, 11)),
+            'quality_score': int(rng.integers(1, 11)),
+            'bundle': bundles[int(rng.integers(N_BUNDLES))]['name'] if in_bundle else None,
+        })
+    # Small catalogs get at most one dependency per two services
+    n_requires = min(n_requires, n_services // 2)
+    for s in rng.choice(n_services - n_requires, n_requires, replace=False):
+        services[s + n_requires].setdefault('requires', []).append(services[s]['name'])
+    return Catalog(1, tasks, services, bundles)
+
+
+def profiles(catalog, seed=0):
+    # (budget, automation answers, quality answers) for a spread of budgets
+    rng = np.random.default_rng(seed)
+    n_tasks = len(catalog.tasks)
+    return [(budget, rng.integers(0, 11, n_tasks).tolist(), rng.integers(0, 11, n_tasks).tolist()) for budget in BUDGETS]
+
+
+def timed(run, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def stages(catalog, corpus):
+    rankers = [Ranker(*profile, False, catalog=catalog, optional_bundles=True) for profile in corpus]
+    solve_inputs = []
+    pareto_inputs = []
+    for ranker in rankers:
+        ranked = ranker.rank_services()
+        constraints = _constraints(catalog, ranked.index, False)
+        solve_inputs.append((ranked.automation_stat, catalog.prices[ranked.index], catalog.task_index[ranked.index], ranker.budget, constraints))
+        pareto_inputs.append((ranked.automation_stat, ranked.quality_stat, *solve_inputs[-1][1:]))
+
+    def solve(name):
+        return lambda: [SOLVERS[name](*args) for args in solve_inputs]
+
+    def rank(objective):
+        return lambda: [Ranker(*profile, False, catalog=catalog, objective=objective, optional_bundles=True).rank_services()
+                        for profile in corpus]
+
+    def sweep():
+        return [ranker.budget_sweep() for ranker in rankers]
+
+    def pareto():
+        # Uncached, unlike pareto_frontier
+        return [ParetoFrontier(*args) for args in pareto_inputs]
+
+    return {
+        'knapsack': solve('knapsack'),
+        'frontier': solve('frontier'),
+        'greedy': solve('greedy'),
+        'pulp': solve('pulp'),
+        'ranker': rank('automation'),
+        'weighted': rank('weighted'),
+        'lexicographic': rank('lexicographic'),
+        'sweep': sweep,
+        'pareto': pareto,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--skip', nargs='*', default=(), help='leave out these stages')
+    parser.add_argument('--max-ms', type=float, help='fail when a Ranker call at 500+ services takes longer')
+    parser.add_argument('--requires', type=int, nargs='+', default=[N_REQUIRES],
+                        help='services with a dependency per catalog, one run per value (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    names = None
+    failures = []
+    for n_requires in args.requires:
+        for n_services, n_tasks in SIZES:
+            catalog = synthetic_catalog(n_services, n_tasks, n_requires=n_requires)
+            corpus = profiles(catalog)
+            results = {}
+            for name, run in stages(catalog, corpus).items():
+                if name in args.skip:
+                    continue
+                run()
+                results[name] = timed(run, args.repeats) / len(corpus) * 1e3
+            if names is None:
+                names = list(results)
+                print(f"{'requires':>8s} {'services':>8s} {'tasks':>6s} " + ' '.join(f"{name + ' ms':>12s}" for name in names))
+            print(f"{n_requires:8d} {n_services:8d} {n_tasks:6d} " + ' '.join(f"{results[name]:12.2f}" for name in names))
+            for name in ('ranker', 'weighted', 'lexicographic'):
+                if args.max_ms and n_services >= 500 and results.get(name, 0) > args.max_ms:
+                    failures.append(f"{name} at {n_services} services and {n_requires} requires: {results[name]:.1f} ms > {args.max_ms} ms")
+
+    for failure in failures:
+        print(f"TOO SLOW {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
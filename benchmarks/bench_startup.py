@@ -0,0 +1,108 @@
+"""
+Cold-start benchmark: how long a fresh process takes to import the app and to serve its first response.
+
+    python -m benchmarks.bench_startup                # compare against benchmarks/startup_baseline.json
+    python -m benchmarks.bench_startup --save         # record a new baseline on this machine
+    python -m benchmarks.bench_startup --importtime   # also list the slowest imports (python -X importtime)
+
+import_app is the wall time of a fresh `python -c "import app"`. first_response is the time from starting
+gunicorn with one worker until GET / answers 200, which is what an autoscaled container waits for
+before it can take traffic. Each is the fastest of several runs.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.loadtest import ROOT, free_port
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_baseline.json')
+
+
+def import_app():
+    # The child skips interpreter teardown, which no server waits for
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import os, app; os._exit(0)'], cwd=ROOT, check=True, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def first_response(timeout=60):
+    port = free_port()
+    env = {**os.environ, 'PORT': str(port), 'WEB_CONCURRENCY': '1'}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:server'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"No response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def slowest_imports(count=15):
+    # Modules imported directly by app and its own modules, by cumulative import time
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if len(name) - len(name.lstrip()) <= 3:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed slowdown factor before failing')
+    parser.add_argument('--importtime', action='store_true', help='list the slowest imports of app')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, run in (('import_app', import_app), ('first_response', first_response)):
+        results[name] = {'seconds': min(run() for _ in range(args.repeats))}
+        print(f"{name:16s} {results[name]['seconds'] * 1e3:10.1f} ms")
+
+    if args.importtime:
+        for cumulative, name in slowest_imports():
+            print(f"{'':16s} {cumulative / 1e3:10.1f} ms  {name}")
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = [
+        f"{name} seconds: {result['seconds']:.6g} > {args.tolerance} x baseline {baseline[name]['seconds']:.6g}"
+        for name, result in results.items()
+        if name in baseline and result['seconds'] > baseline[name]['seconds'] * args.tolerance
+    ]
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
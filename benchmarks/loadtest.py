@@ -0,0 +1,178 @@
+"""
+Load test for the recommendation callback under gunicorn, using only the standard library.
+
+    python -m benchmarks.loadtest                         # 1, 4 and 16 workers
+    python -m benchmarks.loadtest --workers 4 --concurrency 64 --duration 20
+    python -m benchmarks.loadtest --url http://host:8080  # an already running server
+
+For each worker count a gunicorn server is started twice with gunicorn.conf.py, and
+concurrent asyncio clients POST the recommendation callback to it. The cached run sends
+profiles drawn from the benchmark corpus, which repeat, to a server with its default
+recommendation cache; the uncached run sends random profiles that never repeat to a server
+with the cache turned off, so that every request ranks. Reports throughput and
+p50/p95/p99 latency of both runs per worker count.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from app import AUTOMATION_INPUTS, COPILOT_PRICE, QUALITY_INPUTS
+from benchmarks.bench_ranker import corpus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CALLBACK_OUTPUT = '..recommendation.data...error-message.children..'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/_dash-dependencies', timeout=1) as response:
+                return json.load(response)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout}s")
+
+
+def random_profile(rng):
+    # (budget, automation answers, quality answers, copilot) with every answer drawn afresh
+    return (rng.randint(0, 150), [rng.randint(0, 15) for _ in AUTOMATION_INPUTS],
+            [rng.randint(1, 10) for _ in QUALITY_INPUTS], rng.random() < 0.5)
+
+
+def payloads(dependencies, count, seed=0, unique=False):
+    # Callback request bodies for random corpus profiles, or with unique for random profiles that
+    # never repeat; the store is left empty so only the server's caches can skip the ranking
+    callback = next(dep for dep in dependencies if dep['output'] == CALLBACK_OUTPUT)
+    outputs = [{'id': output.rsplit('.', 1)[0], 'property': output.rsplit('.', 1)[1]} for output in CALLBACK_OUTPUT.strip('.').split('...')]
+    rng = random.Random(seed)
+    profiles = corpus()
+    bodies = []
+    for _ in range(count):
+        budget, automation_vals, quality_vals, copilot = random_profile(rng) if unique else rng.choice(profiles)
+        # update_recommendation subtracts the Copilot bundle itself
+        values = dict(zip(AUTOMATION_INPUTS, automation_vals))
+        values.update(zip(QUALITY_INPUTS, quality_vals))
+        values.update({'budget': budget + COPILOT_PRICE if copilot else budget, 'checkbox': copilot})
+        body = {
+            'output': CALLBACK_OUTPUT,
+            'outputs': outputs,
+            'inputs': [{'id': dep['id'], 'property': dep['property'], 'value': 1} for dep in callback['inputs']],
+            'state': [{'id': dep['id'], 'property': dep['property'], 'value': values.get(dep['id'])} for dep in callback['state']],
+            'changedPropIds': ['submit-button.n_clicks'],
+        }
+        bodies.append(json.dumps(body).encode())
+    return bodies
+
+
+async def client(host, port, bodies, deadline, latencies, errors):
+    # One keep-alive connection sending requests back to back until the deadline
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = 0
+        while time.monotonic() < deadline:
+            body = bodies[i % len(bodies)]
+            i += 1
+            request = (
+                f"POST /_dash-update-component HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n"
+            ).encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                errors.append('connection closed by server')
+                break
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode().partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b' 200 ' not in status_line:
+                errors.append(status_line.decode().strip())
+    finally:
+        writer.close()
+
+
+async def run_load(url, concurrency, duration, bodies):
+    parts = urlsplit(url)
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(parts.hostname, parts.port or 80, bodies[i::concurrency] or bodies, deadline, latencies, errors)
+        for i in range(concurrency)
+    ])
+    return latencies, errors, time.perf_counter() - start
+
+
+def report(label, latencies, errors, elapsed):
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"{label:>12s} {len(latencies) / elapsed:10.1f} req/s  p50 {quantiles[49] * 1e3:8.1f} ms  "
+          f"p95 {quantiles[94] * 1e3:8.1f} ms  p99 {quantiles[98] * 1e3:8.1f} ms  errors {len(errors)}")
+    for error in sorted(set(errors))[:3]:
+        print(f"{'':>12s} error: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 4, 16])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=32, help='simultaneous client connections')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per worker count')
+    parser.add_argument('--url', help='load an already running server instead of starting gunicorn')
+    args = parser.parse_args(argv)
+
+    if args.url:
+        # The server's cache settings are its own; unique profiles still miss every cache
+        dependencies = wait_until_up(args.url)
+        for label, unique in (('corpus', False), ('unique', True)):
+            bodies = payloads(dependencies, 20000 if unique else 1000, unique=unique)
+            report(label, *asyncio.run(run_load(args.url, args.concurrency, args.duration, bodies)))
+        return 0
+
+    for workers in args.workers:
+        for label, unique in (('cached', False), ('uncached', True)):
+            port = free_port()
+            env = {**os.environ, 'PORT': str(port), 'WEB_CONCURRENCY': str(workers), 'GUNICORN_THREADS': str(args.threads)}
+            if unique:
+                env['RECOMMENDATION_CACHE_SIZE'] = '0'
+                env.pop('RECOMMENDATION_CACHE_DB', None)
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:server'],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                url = f'http://127.0.0.1:{port}'
+                # Enough unique bodies that no client runs out of fresh ones before the deadline
+                bodies = payloads(wait_until_up(url), 20000 if unique else 1000, unique=unique)
+                report(f'{workers}w {label}', *asyncio.run(run_load(url, args.concurrency, args.duration, bodies)))
+            finally:
+                server.terminate()
+                server.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import hashlib
+import itertools
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_key(automation_vals, quality_vals, budget, copilot):
+    """
+    Build the cache key for one recommendation request.
+    Scores are normalized the same way Ranker reads them: a list with any missing answer counts as all zeros.
+    """
+    def scores(vals):
+        if None in vals:
+            return (0.0,) * len(vals)
+        return tuple(float(v) for v in vals)
+
+    return scores(automation_vals), scores(quality_vals), float(budget), bool(copilot)
+
+
+class SQLiteBackend:
+    """
+    Shared cache backend in a local SQLite file, so every gunicorn worker on a host can reuse results.
+    Every purge_every writes, expired rows are deleted and the table is cut back to max_rows.
+    """
+    def __init__(self, path, max_rows=100000, purge_every=100):
+        self.path = path
+        self.max_rows = max_rows
+        self.purge_every = purge_every
+        self._writes = itertools.count(1)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL, value BLOB)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+
+    def _connect(self):
+        # sqlite3 connections cannot be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5)
+        return conn
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def _purge(self, conn):
+        # Part of a write: drop expired rows, then the rows closest to expiring beyond max_rows
+        if next(self._writes) % self.purge_every:
+            return
+        conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires > ?", (self._digest(key), time.time())
+        ).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                (self._digest(key), time.time() + ttl, pickle.dumps(value)),
+            )
+            self._purge(conn)
+
+    def update(self, key, fields, ttl):
+        """
+        Merge fields into the dict stored under key and return the result, in one write transaction
+        so that concurrent updates from other processes are never lost.
+        """
+        conn = self._connect()
+        with conn:
+            # Take the write lock before reading, so no other writer can slip in between
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires > ?", (self._digest(key), time.time())
+            ).fetchone()
+            state = {**(pickle.loads(row[0]) if row else {}), **fields}
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                (self._digest(key), time.time() + ttl, pickle.dumps(state)),
+            )
+            self._purge(conn)
+        return state
+
+
+class RecommendationCache:
+    """
+    Bounded in-process cache with LRU and TTL eviction, hit/miss counters and an optional shared backend
+    """
+    def __init__(self, maxsize=512, ttl=600, backend=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.backend is not None:
+            value = self.backend.get(key)
+            if value is not None:
+                self._store(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._store(key, value)
+        if self.backend is not None:
+            self.backend.set(key, value, self.ttl)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+            }
+
+
+class SessionStore:
+    """
+    Server-side state of each browser session: the latest answers and recommendation.
+    Held in memory with LRU and TTL eviction, or in a shared backend when several workers serve the app.
+    """
+    def __init__(self, maxsize=1024, ttl=3600, backend=None):
+        self.ttl = ttl
+        self.backend = backend
+        # With a shared backend every read goes to it, since another worker may have updated the session
+        self._memory = RecommendationCache(maxsize, ttl) if backend is None else None
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        if self.backend is not None:
+            state = self.backend.get(session_id)
+        else:
+            state = self._memory.get(session_id)
+        return state or {}
+
+    def update(self, session_id, **fields):
+        if self.backend is not None:
+            # The lock only covers this process; the backend makes the update atomic across workers
+            return self.backend.update(session_id, fields, self.ttl)
+        with self._lock:
+            state = {**self.get(session_id), **fields}
+            self._memory.set(session_id, state)
+        return state
@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+
+from solvers import MAX_CONSTRAINT_ANCHORS
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json')
+SUPPORTED_VERSIONS = (1,)
+# Bundle the app's Copilot checkbox stands for; its price comes out of the user's budget
+COPILOT_BUNDLE = 'Copilot Pro'
+
+
+def _frozen(values, dtype):
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+class Catalog:
+    """
+    Immutable service catalog: one entry per service in compact NumPy arrays,
+    plus the task (one user answer per task) of each service,
+    and the bundle and dependency rules between services.
+    """
+    def __init__(self, version, tasks, services, bundles=()):
+        self.version = version
+        self.tasks = tuple(tasks)
+        self.bundles = {bundle['name']: bundle['price'] for bundle in bundles}
+        for name, price in self.bundles.items():
+            if price != int(price):
+                raise ValueError(f"Bundle {name} needs a whole-dollar price, got {price}")
+
+        task_positions = {task: position for position, task in enumerate(self.tasks)}
+        service_positions = {service['name']: position for position, service in enumerate(services)}
+        for service in services:
+            if service['task'] not in task_positions:
+                raise ValueError(f"Service {service['name']} has unknown task {service['task']}")
+            if service.get('bundle') is not None and service['bundle'] not in self.bundles:
+                raise ValueError(f"Service {service['name']} has unknown bundle {service['bundle']}")
+            if service['price'] != int(service['price']):
+                raise ValueError(f"Service {service['name']} needs a whole-dollar price, got {service['price']}")
+            for required in service.get('requires', ()):
+                if required not in service_positions:
+                    raise ValueError(f"Service {service['name']} requires unknown service {required}")
+
+        self.services = _frozen([service['name'] for service in services], object)
+        self.prices = _frozen([service['price'] for service in services], int)
+        self.auto_scores = _frozen([service['auto_score'] for service in services], float)
+        self.quality_scores = _frozen([service['quality_score'] for service in services], float)
+        self.in_bundle = _frozen([service.get('bundle') is not None for service in services], bool)
+        bundle_positions = {name: position for position, name in enumerate(self.bundles)}
+        self.bundle_index = _frozen([bundle_positions.get(service.get('bundle'), -1) for service in services], int)
+        self.bundle_prices = _frozen(list(self.bundles.values()), int)
+        # (service, required service) position pairs: the first is only usable together with the second
+        self.requires = tuple(
+            (position, service_positions[required])
+            for position, service in enumerate(services) for required in service.get('requires', ())
+        )
+        n_required = len({required for _, required in self.requires})
+        if len(self.bundles) + n_required > MAX_CONSTRAINT_ANCHORS:
+            raise ValueError(f"{len(self.bundles)} bundles and {n_required} required services exceed "
+                             f"the {MAX_CONSTRAINT_ANCHORS} the solvers support")
+
+        # Which user answer applies to each service
+        self.task_index = _frozen([task_positions[service['task']] for service in services], int)
+        self.task_names = _frozen(self.tasks, object)[self.task_index]
+        self.task_names.flags.writeable = False
+
+    def __len__(self):
+        return len(self.services)
+
+
+def load_catalog(path=None):
+    """
+    Load a versioned service catalog from a JSON file.
+    Defaults to $SERVICE_CATALOG, then the catalog.json shipped next to this module.
+    """
+    path = path or os.environ.get('SERVICE_CATALOG', DEFAULT_CATALOG_PATH)
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('version') not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported catalog version {data.get('version')} in {path}")
+    return Catalog(data['version'], data['tasks'], data['services'], data.get('bundles', ()))
+
+
+# Loaded once per process, before any request is served
+CATALOG = load_catalog()
@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from metrics import METRICS
+from solvers import SOLVERS, greedy_select
+
+
+def _solve(solver, values, prices, groups, budget, constraints):
+    # Runs in a pool process
+    return SOLVERS[solver](np.asarray(values), np.asarray(prices), np.asarray(groups), budget, constraints)
+
+
+class SolverExecutor:
+    """
+    Bounded process pool for selection solves.
+    Identical in-flight solves share one future; when the queue is full, a solve takes
+    longer than the timeout or a pool process dies, the request gets a greedy selection
+    instead of waiting. A broken pool is replaced on the next solve.
+    """
+    def __init__(self, max_workers=2, max_pending=None, timeout=2.0):
+        self.max_workers = max_workers
+        self.max_pending = max_pending or 4 * max_workers
+        self.timeout = timeout
+        self._pool = None
+        self._pid = None
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        # Created lazily, and again after a fork, so gunicorn workers never share a pool
+        if self._pool is None or self._pid != os.getpid():
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            self._pid = os.getpid()
+            self._in_flight = {}
+        return self._pool
+
+    def _drop_pool(self, pool):
+        # A pool with a dead process fails every future and every submit from then on
+        with self._lock:
+            if self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self._in_flight = {}
+
+    def _submit(self, key):
+        # Returns the future for key and its pool, or (None, None) when the queue is full
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                METRICS.count('solver_pool_coalesced_total')
+                return future, self._pool
+            if len(self._in_flight) >= self.max_pending:
+                return None, None
+            pool = self._get_pool()
+            try:
+                future = pool.submit(_solve, *key)
+            except BrokenProcessPool:
+                future = None
+            if future is not None:
+                self._in_flight[key] = future
+        if future is None:
+            self._drop_pool(pool)
+            raise BrokenProcessPool("Solver pool is broken")
+
+        def done(_):
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+        future.add_done_callback(done)
+        return future, pool
+
+    def solve(self, solver, values, prices, groups, budget, constraints=None):
+        """
+        Solve in the pool. Returns (selected, exact): exact is False when the pool fell back to a
+        greedy selection, which callers should not cache or reuse as the solver's answer.
+        """
+        key = (solver, tuple(np.asarray(values, dtype=float).tolist()), tuple(np.asarray(prices).tolist()),
+               tuple(np.asarray(groups).tolist()), budget, constraints or None)
+        pool = None
+        try:
+            future, pool = self._submit(key)
+            if future is None:
+                METRICS.count('solver_pool_fallbacks_total', reason='queue_full')
+                return greedy_select(values, prices, groups, budget, constraints), False
+            return future.result(timeout=self.timeout), True
+        except TimeoutError:
+            METRICS.count('solver_pool_fallbacks_total', reason='timeout')
+        except BrokenProcessPool:
+            if pool is not None:
+                self._drop_pool(pool)
+            METRICS.count('solver_pool_fallbacks_total', reason='broken')
+        return greedy_select(values, prices, groups, budget, constraints), False
+
+    def shutdown(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
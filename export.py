@@ -0,0 +1,234 @@
+"""
+Cohort export: rank every profile in a CSV or Parquet file and stream the results as CSV or Parquet.
+
+    python -m export profiles.csv                       # CSV to stdout
+    python -m export profiles.csv -o results.parquet    # Parquet, one row group per chunk of profiles
+
+A profile file has a budget column, an optional copilot column (0/1 or true/false, default false),
+an optional profile column identifying each row (default the row number), and one auto_<task> and
+one quality_<task> column per catalog task, as the app asks them. As in the app, the budget includes
+the Copilot bundle: its price is taken out of the budget of every copilot profile, and a copilot
+profile whose budget is below that price gets no selection and True in the Below Copilot price
+column. Profiles are read, ranked with Ranker.rank_batch and written one chunk at a time, so memory
+stays flat however large the cohort is.
+Parquet needs pyarrow, which is optional.
+"""
+import argparse
+import io
+import itertools
+import sys
+
+import numpy as np
+import pandas as pd
+
+from catalog import CATALOG, COPILOT_BUNDLE
+from ranker import Ranker
+
+FORMATS = ('csv', 'parquet')
+CHUNK_SIZE = 1000
+
+
+def profile_columns(catalog=CATALOG):
+    # Answer columns of a profile file, in the order Ranker.rank_batch takes them
+    return [f"auto_{task}" for task in catalog.tasks] + [f"quality_{task}" for task in catalog.tasks]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def format_of(path, default='csv'):
+    """
+    File format from a file name's extension.
+    """
+    return 'parquet' if str(path).lower().endswith(('.parquet', '.pq')) else default
+
+
+def read_profiles(source, file_format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Yield the profiles of a path or binary file object as DataFrames of at most chunk_size rows.
+    """
+    if file_format == 'parquet':
+        parquet_file = _pyarrow().parquet.ParquetFile(source)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size)
+
+
+def rank_profiles(chunk, start=0, catalog=CATALOG, selected_only=False):
+    """
+    Rank one chunk of a profile file. start numbers its rows when the file has no profile column.
+    Budgets include the Copilot bundle, as the app takes them. Returns the Ranker.rank_batch rows with the
+    profile ids in the Profile column, and a Below Copilot price column flagging copilot profiles that
+    cannot afford the bundle.
+    """
+    columns = profile_columns(catalog)
+    missing = [column for column in ['budget'] + columns if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Profile file is missing columns {missing}")
+    budgets = pd.to_numeric(chunk['budget'], errors='coerce').to_numpy(dtype=float)
+    if np.isnan(budgets).any():
+        raise ValueError(f"Budget is missing for {int(np.isnan(budgets).sum())} profiles")
+    if 'copilot' not in chunk.columns:
+        copilot = np.zeros(len(chunk), dtype=bool)
+    elif pd.api.types.is_numeric_dtype(chunk['copilot']):
+        copilot = chunk['copilot'].fillna(0).to_numpy() != 0
+    else:
+        copilot = chunk['copilot'].astype(str).str.strip().str.lower().isin(('1', 'true', 'yes')).to_numpy()
+    profiles = chunk[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    ids = chunk['profile'].to_numpy() if 'profile' in chunk.columns else np.arange(start, start + len(chunk))
+
+    # The budget includes the Copilot bundle, which the app prepays out of it; the app refuses
+    # a smaller budget, so those profiles are flagged and get nothing selected
+    bundle_price = catalog.bundles.get(COPILOT_BUNDLE, 0)
+    under = copilot & (budgets < bundle_price)
+    budgets = np.where(under, -1, budgets - np.where(copilot, bundle_price, 0))
+
+    ranked = Ranker.rank_batch(profiles, budgets, copilot, catalog=catalog)
+    ranked['Below Copilot price'] = under[ranked['Profile'].to_numpy()]
+    ranked['Profile'] = ids[ranked['Profile'].to_numpy()]
+    if selected_only:
+        ranked = ranked[ranked['selected']].drop(columns='selected')
+    return ranked
+
+
+def export_frames(chunks, catalog=CATALOG, selected_only=False):
+    """
+    Yield the ranked rows of each chunk of profiles as it is computed.
+    """
+    start = 0
+    for chunk in chunks:
+        yield rank_profiles(chunk, start, catalog, selected_only)
+        start += len(chunk)
+
+
+def stream_csv(frames):
+    """
+    CSV text of the frames, one piece per frame, with the header once.
+    """
+    header = True
+    for frame in frames:
+        yield frame.to_csv(index=False, header=header)
+        header = False
+
+
+class _Sink(io.RawIOBase):
+    # Write-only file that hands its bytes over as they come, while keeping the file
+    # offsets ParquetWriter records for its footer
+    def __init__(self):
+        self.position = 0
+        self.pieces = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.pieces.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b''.join(self.pieces)
+        self.pieces = []
+        return data
+
+
+def stream_parquet(frames):
+    """
+    Parquet bytes of the frames, one row group per frame, handed over as each group is written.
+    """
+    pyarrow = _pyarrow()
+    sink = _Sink()
+    writer = None
+    for frame in frames:
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.take()
+    if writer is not None:
+        writer.close()
+    yield sink.take()
+
+
+STREAMS = {'csv': stream_csv, 'parquet': stream_parquet}
+MIMETYPES = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+
+def register(server, path='/export', catalog=CATALOG, chunk_size=CHUNK_SIZE):
+    """
+    Serve cohort exports on a Flask server: POST a profile file as the 'profiles' form field,
+    with ?format=csv|parquet for the output (default csv) and ?selected=1 for selected services only.
+    The first chunk is ranked before responding so that a malformed file gets a 400.
+    """
+    from flask import Response, request, stream_with_context
+
+    @server.route(path, methods=['POST'])
+    def export_endpoint():
+        upload = request.files.get('profiles')
+        output_format = request.args.get('format', 'csv')
+        if upload is None:
+            return Response("Expected a profile file in the 'profiles' field\n", status=400, mimetype='text/plain')
+        if output_format not in FORMATS:
+            return Response(f"Unknown format {output_format}, expected one of {list(FORMATS)}\n", status=400, mimetype='text/plain')
+        selected_only = request.args.get('selected', '0').lower() in ('1', 'true', 'yes')
+
+        frames = export_frames(read_profiles(upload.stream, format_of(upload.filename), chunk_size), catalog, selected_only)
+        try:
+            if output_format == 'parquet':
+                _pyarrow()
+            first = next(frames, None)
+        except (ValueError, pd.errors.ParserError) as error:
+            return Response(f"{error}\n", status=400, mimetype='text/plain')
+
+        def rest():
+            if first is not None:
+                yield first
+            yield from frames
+
+        return Response(
+            stream_with_context(STREAMS[output_format](rest())),
+            mimetype=MIMETYPES[output_format],
+            headers={'Content-Disposition': f'attachment; filename=recommendations.{output_format}'},
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('profiles', help='CSV or Parquet profile file')
+    parser.add_argument('-o', '--output', default='-', help='output file (default stdout)')
+    parser.add_argument('--format', choices=FORMATS, help='output format (default from the output file name, else csv)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='profiles ranked per chunk and Parquet row group')
+    parser.add_argument('--selected-only', action='store_true', help='write only the selected services')
+    args = parser.parse_args(argv)
+
+    output_format = args.format or format_of(args.output)
+    try:
+        # Fail before the output file is created or truncated
+        if 'parquet' in (output_format, format_of(args.profiles)):
+            _pyarrow()
+        frames = export_frames(read_profiles(args.profiles, format_of(args.profiles), args.chunk_size), selected_only=args.selected_only)
+        stream = STREAMS[output_format](frames)
+        # Rank the first chunk too, so that a malformed profile file leaves the output alone
+        stream = itertools.chain(list(itertools.islice(stream, 1)), stream)
+        if args.output == '-':
+            (sys.stdout if output_format == 'csv' else sys.stdout.buffer).writelines(stream)
+            return 0
+        with open(args.output, 'w', newline='') if output_format == 'csv' else open(args.output, 'wb') as f:
+            f.writelines(stream)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Gunicorn settings for serving the Dash app, configurable through the environment:
+
+- PORT: port to listen on (default 8080)
+- WEB_CONCURRENCY: number of worker processes (default 2 x CPUs + 1)
+- GUNICORN_THREADS: threads per worker (default 4)
+- GUNICORN_TIMEOUT: seconds before a silent worker is restarted (default 30)
+- GUNICORN_ACCESS_LOG: access log destination, '-' for stdout (default off)
+- METRICS_DIR: directory where the workers share their metrics (default a fresh temporary directory)
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Import the app (catalog, figure templates, pandas/plotly/dash) once in the master
+# so forked workers share that memory copy-on-write instead of each loading it
+preload_app = True
+
+# Access log destination, e.g. '-' for stdout; off unless set
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+
+# Each /metrics scrape lands on one worker, so the workers pool their metrics in files under
+# METRICS_DIR. Set here, before the app is imported, and emptied on every start so the totals
+# restart with the server.
+if os.environ.get('ENABLE_METRICS', '0').lower() in ('1', 'true', 'yes'):
+    os.environ.setdefault('METRICS_DIR', tempfile.mkdtemp(prefix='course_app_metrics_'))
+
+
+def on_starting(server):
+    if os.environ.get('METRICS_DIR'):
+        for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], '*.json')):
+            os.remove(path)
@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger('course_app.requests')
+
+# Shared no-op returned by every span while metrics are off, so instrumented code costs one call
+_NO_SPAN = nullcontext()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Metrics:
+    """
+    In-process timing spans, counters and summaries, rendered in the Prometheus text format.
+    Spans opened inside a request() block are also collected into one structured log line per request.
+    With a directory, every process writes its values there after each request and /metrics renders
+    the sum over all processes, so any worker answers a scrape with the same totals.
+    """
+    def __init__(self, enabled=False, prefix='course_app', directory=None):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.directory = directory
+        self._file = None
+        self._file_pid = None
+        self._counters = {}
+        self._summaries = {}
+        self._help = {}
+        self._gauges = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            count, total, largest = self._summaries.get(key, (0, 0.0, 0.0))
+            self._summaries[key] = (count + 1, total + value, max(largest, value))
+
+    def span(self, stage):
+        """
+        Time a block of code as one stage; a no-op while metrics are off.
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(stage)
+
+    @contextmanager
+    def _span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe('stage_seconds', elapsed, stage=stage)
+            stages = getattr(self._local, 'stages', None)
+            if stages is not None:
+                stages[stage] = stages.get(stage, 0.0) + elapsed
+
+    @contextmanager
+    def request(self, button_id):
+        """
+        Collect the spans of one callback and log them as a single JSON line keyed by button_id.
+        """
+        if not self.enabled:
+            yield {}
+            return
+        fields = {}
+        self._local.stages = {}
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            total = time.perf_counter() - start
+            self.observe('callback_seconds', total, button_id=button_id)
+            record = {'button_id': button_id, 'seconds': round(total, 6),
+                      'stages': {stage: round(seconds, 6) for stage, seconds in self._local.stages.items()}, **fields}
+            self._local.stages = None
+            logger.info(json.dumps(record))
+
+    def gauge(self, name, help_text, read):
+        """
+        Register a gauge whose value is read when the metrics are rendered.
+        """
+        self._help[name] = help_text
+        self._gauges.append((name, read))
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+                'summaries': [[name, labels, summary] for (name, labels), summary in self._summaries.items()],
+                'gauges': [[name, read()] for name, read in self._gauges],
+            }
+
+    def flush(self):
+        """
+        Write this process's values to the shared directory, if there is one.
+        """
+        if not self.enabled or not self.directory:
+            return
+        if self._file_pid != os.getpid():
+            # Named by pid and start time, so a restarted worker that reuses a pid never overwrites its predecessor
+            self._file_pid = os.getpid()
+            self._file = os.path.join(self.directory, f"{self._file_pid}-{time.time_ns()}.json")
+        snapshot = self._snapshot()
+        temporary = f"{self._file}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(temporary, self._file)
+
+    def _collect(self):
+        # Counters and summaries summed over every process that has written to the directory, dead
+        # workers included so that totals never go backwards, and the gauges of the live ones by pid
+        if not self.directory:
+            snapshot = self._snapshot()
+            return (dict(((name, labels), value) for name, labels, value in snapshot['counters']),
+                    dict(((name, labels), summary) for name, labels, summary in snapshot['summaries']),
+                    [(name, (), value) for name, value in snapshot['gauges']])
+        self.flush()
+        counters, summaries, gauges = {}, {}, []
+        for file_name in sorted(os.listdir(self.directory)):
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, (count, total, largest) in snapshot['summaries']:
+                key = (name, tuple(map(tuple, labels)))
+                previous = summaries.get(key, (0, 0.0, 0.0))
+                summaries[key] = (previous[0] + count, previous[1] + total, max(previous[2], largest))
+            pid = int(file_name.split('-')[0])
+            if _alive(pid):
+                gauges.extend((name, (('pid', pid),), value) for name, value in snapshot['gauges'])
+        return counters, summaries, sorted(gauges)
+
+    def render(self):
+        lines = []
+
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f"# HELP {self.prefix}_{name} {self._help[name]}")
+            lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+
+        counters, summaries, gauges = self._collect()
+        counters = sorted(counters.items())
+        summaries = sorted(summaries.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                header(name, 'counter')
+                seen.add(name)
+            lines.append(f"{self.prefix}_{name}{_label_text(labels)} {value}")
+        for (name, labels), (count, total, largest) in summaries:
+            if name not in seen:
+                header(name, 'summary')
+                seen.add(name)
+            lines.append(f"{self.prefix}_{name}_count{_label_text(labels)} {count}")
+            lines.append(f"{self.prefix}_{name}_sum{_label_text(labels)} {total:.9g}")
+            lines.append(f"{self.prefix}_{name}_max{_label_text(labels)} {largest:.9g}")
+        for name, labels, value in gauges:
+            if name not in seen:
+                header(name, 'gauge')
+                seen.add(name)
+            lines.append(f"{self.prefix}_{name}{_label_text(labels)} {value:.9g}")
+        return '\n'.join(lines) + '\n'
+
+    def register(self, server, path='/metrics', callback_path='/_dash-update-component'):
+        """
+        Expose the metrics on a Flask server and record the size and duration of Dash callback responses.
+        Nothing is registered while metrics are off.
+        """
+        if not self.enabled:
+            return
+        from flask import Response, g, request
+
+        if not logger.handlers:
+            logger.addHandler(logging.StreamHandler())
+            logger.setLevel(logging.INFO)
+
+        self.describe('stage_seconds', 'Time spent in each stage of the recommendation path')
+        self.describe('callback_seconds', 'Time spent in the recommendation callbacks by button')
+        self.describe('response_bytes', 'Size of Dash callback responses')
+        self.describe('response_seconds', 'Time to serve Dash callback requests, including JSON serialization')
+        self.describe('solver_calls_total', 'Selection solves by solver backend')
+        self.describe('ranker_session_total', 'Incremental re-ranks by outcome: solved, or the reason the last selection was reused')
+        self.describe('solver_pool_coalesced_total', 'Pool solves answered by an identical solve already in flight')
+        self.describe('solver_pool_fallbacks_total', 'Pool solves answered greedily because the queue was full, the solve timed out or the pool broke')
+
+        @server.before_request
+        def start_timer():
+            g.metrics_start = time.perf_counter()
+
+        @server.after_request
+        def record_response(response):
+            if request.path.endswith(callback_path):
+                self.observe('response_seconds', time.perf_counter() - g.metrics_start)
+                size = response.content_length
+                if size is None and not response.is_streamed:
+                    size = len(response.get_data())
+                self.observe('response_bytes', size or 0)
+            self.flush()
+            return response
+
+        @server.route(path)
+        def metrics_endpoint():
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+# Process-wide registry, switched on with ENABLE_METRICS=1; METRICS_DIR shares it between worker processes
+METRICS = Metrics(enabled=os.environ.get('ENABLE_METRICS', '0').lower() in ('1', 'true', 'yes'),
+                  directory=os.environ.get('METRICS_DIR'))
@@ -1,104 +1,455 @@
+import math
 import pandas as pd
 import numpy as np
-import pulp as lp
+from catalog import CATALOG
+from metrics import METRICS
+from solvers import (MAX_PARETO_LABELS, SOLVERS, Constraints, budget_frontier, constrained_select_batch, knapsack_select,
+                     knapsack_select_batch, pareto_frontier, selection_spend)
+
+def _task_answers(answers_raw):
+    # One float per task; a missing answer zeroes the whole vector
+    if None in answers_raw:
+        return np.zeros(len(answers_raw))
+    return np.asarray(answers_raw, dtype=float)
+
+
+def _available(catalog, copilot, optional_bundles=False):
+    # Catalog positions of the services under consideration: bundled services only when their
+    # bundle is prepaid (Copilot) or may be bought, and never one whose required service is out
+    available = np.ones(len(catalog), dtype=bool) if copilot or optional_bundles else ~catalog.in_bundle
+    changed = True
+    while changed:
+        changed = False
+        for i, required in catalog.requires:
+            if available[i] and not available[required]:
+                available[i] = False
+                changed = True
+    return np.flatnonzero(available)
+
+
+def _constraints(catalog, positions, bundles_prepaid):
+    # Bundle and dependency rules between the services at these catalog positions, in that order
+    slot = np.full(len(catalog), -1)
+    slot[positions] = np.arange(len(positions))
+    requires = tuple((int(slot[i]), int(slot[required])) for i, required in catalog.requires
+                     if slot[i] >= 0 and slot[required] >= 0)
+    if bundles_prepaid or not catalog.in_bundle[positions].any():
+        return Constraints(requires=requires)
+    return Constraints(tuple(catalog.bundle_index[positions].tolist()), tuple(catalog.bundle_prices.tolist()), requires)
+
+
+# What the selection maximizes: hours saved alone, a weighted sum of hours saved and quality,
+# or hours saved with quality deciding between equally good selections
+OBJECTIVES = ("automation", "weighted", "lexicographic")
+
+
+def _budget_sweep(ranked, bundles_prepaid, budgets=None, values=None, secondary=None):
+    # Ranker.budget_sweep for a RankedServices record; values and secondary, in rank order, are
+    # what the selection maximizes when that is not the automation stat alone
+    catalog = ranked.catalog
+    prices = catalog.prices[ranked.index]
+    groups = catalog.task_index[ranked.index]
+    constraints = _constraints(catalog, ranked.index, bundles_prepaid)
+    if constraints or values is not None:
+        return _constrained_sweep(ranked, prices, groups, constraints, budgets, values, secondary)
+    with METRICS.span('rank_sweep'):
+        frontier = budget_frontier(ranked.automation_stat, prices, groups)
+        if budgets is None:
+            budgets = np.arange(frontier.max_spend + 1)
+        budgets = np.asarray(budgets)
+
+        # The frontier changes selection only at its breakpoints; look every budget up among them
+        totals = np.array([0.0] + frontier.totals)
+        spends = np.array([0] + [prices[selected].sum() for selected in frontier.selections])
+        segments = np.searchsorted(frontier.breakpoints, np.floor(budgets), side='right')
+        return pd.DataFrame({
+            'Budget': budgets,
+            'Hours saved': totals[segments],
+            'Price per month': spends[segments],
+        })
+
+
+def _constrained_sweep(ranked, prices, groups, constraints, budgets, values=None, secondary=None):
+    # Bundles, dependencies and other objectives break the breakpoint structure; solve every
+    # budget in one batch
+    with METRICS.span('rank_sweep'):
+        if budgets is None:
+            most = sum(prices[groups == group].max() for group in np.unique(groups))
+            budgets = np.arange(int(most) + sum(constraints.bundle_prices) + 1)
+        budgets = np.asarray(budgets)
+        values = ranked.automation_stat if values is None else values
+        selected = constrained_select_batch(values, prices, groups, budgets, constraints, secondary)
+        return pd.DataFrame({
+            'Budget': budgets,
+            'Hours saved': np.where(selected, ranked.automation_stat, 0).sum(axis=1),
+            'Price per month': selection_spend(selected, prices, constraints),
+        })
+
+
+class RankedServices:
+    """
+    Ranked services for one user as parallel NumPy arrays, in rank order
+    """
+    __slots__ = ('index', 'automation_stat', 'quality_stat', 'cost_effectiveness', 'user_auto_score', 'selected', 'catalog')
+
+    def __init__(self, index, automation_stat, quality_stat, cost_effectiveness, user_auto_score, selected, catalog):
+        self.index = index
+        self.automation_stat = automation_stat
+        self.quality_stat = quality_stat
+        self.cost_effectiveness = cost_effectiveness
+        self.user_auto_score = user_auto_score
+        self.selected = selected
+        self.catalog = catalog
+
+    @property
+    def services(self):
+        return self.catalog.services[self.index]
+
+    def to_frame(self):
+        catalog, index = self.catalog, self.index
+        return pd.DataFrame({
+            'Rank': np.arange(1, len(index) + 1),
+            'Service': catalog.services[index],
+            'Hours saved': self.automation_stat,
+            'Hours spent': self.user_auto_score,
+            'Quality Score': catalog.quality_scores[index],
+            'Price per month': catalog.prices[index],
+            'Task': catalog.task_names[index],
+            'selected': self.selected,
+        }, index=index)
+
 
 class Ranker:
     """
     Class to recommend services based on user input, review scores, and budget 
     """
-    def __init__(self, budget, user_auto_scores_raw, user_quality_scores_raw, copilot):
-        quality_scores = [2, 3, 9, 5, 9.5, 7, 8, 8, 9, 1, 1]
-        auto_scores = [7, 5, 8, 7, 7.5, 9, 9.5, 8, 10, 10, 10]
-        services = [
-                    "AI Assistants", 
-                    "Copilot (PowerPoint)", 
-                    "Beautiful AI", 
-                    "Copilot (Word)",
-                    "Grammarly",
-                    "Trevor AI",
-                    "Motion",
-                    "Krisp",
-                    "Otter",
-                    "Zapier (2-step)",
-                    "Zapier (multi-step)"
-                ]
-        copilot_list = ["Copilot (PowerPoint)", "Copilot (Word)"]
-
-        tasks = ["Reading texts", "PowerPoint", "PowerPoint", "Writing", "Writing", "Scheduling", "Scheduling", "Meetings", "Meetings", "Web apps (2-step)", "Web apps (multi-step)"]
-        
-        if None in user_auto_scores_raw:
-            user_auto_scores = [0] * 11
-        else:
-            r1 = user_auto_scores_raw
-            user_auto_scores = [r1[0], r1[1], r1[1], r1[2], r1[2], r1[3], r1[3], r1[4], r1[4], r1[5], r1[6]]
-            user_auto_scores = pd.to_numeric(user_auto_scores)
-        if None in user_quality_scores_raw:
-            user_quality_scores = [0] * 11
-        else:
-            r2 = user_quality_scores_raw
-            user_quality_scores = [r2[0], r2[1], r2[1], r2[2], r2[2], r2[3], r2[3], r2[4], r2[4], r2[5], r2[6]]
-            user_quality_scores = pd.to_numeric(user_quality_scores)
+    def __init__(self, budget, user_auto_scores_raw, user_quality_scores_raw, copilot, solver="knapsack", catalog=CATALOG, executor=None,
+                 objective="automation", quality_weight=0.5, optional_bundles=False):
+        self.catalog = catalog
+        n_tasks = len(catalog.tasks)
+        assert len(user_auto_scores_raw) == n_tasks, f"{len(user_auto_scores_raw)}!={n_tasks}"
+        assert len(user_quality_scores_raw) == n_tasks, f"{len(user_quality_scores_raw)}!={n_tasks}"
 
+        # Fan each task answer out to the services of that task
+        user_auto_scores = _task_answers(user_auto_scores_raw)[catalog.task_index]
+        user_quality_scores = _task_answers(user_quality_scores_raw)[catalog.task_index]
 
-        assert len(services) == len(user_auto_scores), f"{len(user_auto_scores)}!={len(services)}"
-        assert len(services) == len(user_quality_scores), f"{len(user_quality_scores)}!={len(services)}" 
-        prices = [0, 0, 12, 0, 12, 0, 19, 0, 8, 0, 20]
         self.budget = budget
         assert self.budget is not None, "Budget is missing"
-        self.data = pd.DataFrame({"service": services, "user_auto_score": user_auto_scores, "user_quality_score": user_quality_scores, "auto_score": auto_scores, "quality_score": quality_scores, "price": prices, "task": tasks})
+        assert solver in SOLVERS, f"Unknown solver {solver}, expected one of {list(SOLVERS)}"
+        self.solver = solver
+        # Optional SolverExecutor that runs the solve in a process pool
+        self.executor = executor
+        assert objective in OBJECTIVES, f"Unknown objective {objective}, expected one of {list(OBJECTIVES)}"
+        assert 0 <= quality_weight <= 1, f"quality_weight must be between 0 and 1, got {quality_weight}"
+        self.objective = objective
+        self.quality_weight = quality_weight
+
+        # Without Copilot, optional_bundles lets the selection buy a bundle for its services
+        # rather than leaving them out
+        self.copilot = bool(copilot)
+        self.optional_bundles = optional_bundles
+        self.index = _available(catalog, copilot, optional_bundles)
+        self.user_auto_scores = user_auto_scores[self.index]
+        self.user_quality_scores = user_quality_scores[self.index]
+        # False when the executor answered with its greedy fallback instead of the solver
+        self.exact = True
+
+    def rank_services(self):
+        """
+        Rank and select services on plain NumPy arrays.
+        Returns a RankedServices record in rank order; rank() turns it into the final DataFrame.
+        """
+        catalog, index = self.catalog, self.index
+        with METRICS.span('rank_score_sort'):
+            prices = catalog.prices[index]
+            automation_stat = catalog.auto_scores[index] * 0.1 * self.user_auto_scores
+            quality_stat = catalog.quality_scores[index] * 0.1 * self.user_quality_scores
+            cost_effectiveness = np.where(prices == 0, automation_stat, automation_stat / np.where(prices == 0, 1, prices))
+
+            # Sort based on automation_stat with quality_stat as tie-breaker (stable, like pandas)
+            order = np.lexsort((-quality_stat, -automation_stat))
+            constraints = _constraints(catalog, index[order], self.copilot)
+
+        # Checking for non-null values before solving
+        if np.isnan(self.user_auto_scores).all():
+            selected = np.ones(len(order), dtype=bool)
+        elif self.objective != "automation":
+            # Both stats count: one knapsack over the objective, the other stat breaking ties
+            METRICS.count('solver_calls_total', solver='knapsack')
+            with METRICS.span('rank_solve'):
+                values, secondary = self._objective_values(automation_stat, quality_stat)
+                selected = knapsack_select(values[order], prices[order], catalog.task_index[index][order], self.budget, constraints,
+                                           secondary=secondary[order])
+        else:
+            # Select at most one service per task within budget, maximizing automation_stat
+            METRICS.count('solver_calls_total', solver=self.solver)
+            with METRICS.span('rank_solve'):
+                args = (automation_stat[order], prices[order], catalog.task_index[index][order], self.budget, constraints)
+                if self.executor is None:
+                    selected = SOLVERS[self.solver](*args)
+                else:
+                    selected, self.exact = self.executor.solve(self.solver, *args)
+
+        return RankedServices(
+            index=index[order],
+            automation_stat=automation_stat[order],
+            quality_stat=quality_stat[order],
+            cost_effectiveness=cost_effectiveness[order],
+            user_auto_score=self.user_auto_scores[order],
+            selected=selected,
+            catalog=catalog,
+        )
+
+    def _objective_values(self, automation_stat, quality_stat):
+        # (values, secondary) the selection maximizes under a non-automation objective
+        if self.objective == "weighted":
+            return (1 - self.quality_weight) * automation_stat + self.quality_weight * quality_stat, automation_stat
+        return automation_stat, quality_stat
 
-        if not copilot:
-            self.data = self.data[~self.data['service'].isin(copilot_list)]
-    
     def rank(self):
-        # if not all(score == 0 for score in self.data['user_auto_score'].values):
-        #     assert 0, f"Auto score: {self.data['auto_score']} user auto score: {self.data['user_auto_score']}"
-        self.data['automation_stat'] = self.data['auto_score'] * 0.1 * self.data['user_auto_score']
-        self.data['quality_stat'] = self.data['quality_score'] * 0.1 * self.data['user_quality_score']
-        self.data['cost_effectiveness'] = np.where(self.data['price'] == 0, self.data['automation_stat'], self.data['automation_stat'] / np.where(self.data['price'] == 0, 1, self.data['price']))
-
-        # Sort the DataFrame based on automation cost effectiveness and quality_stat as tie-breaker
-        df_sorted = self.data.sort_values(by=['automation_stat', 'quality_stat'], ascending=[False, False])
-
-        # Checking for non-null values before asserting sort order
-        if (self.data['user_auto_score'].isnull()).all():
-            selected_services = self.data['service']
+        self.ranked = self.rank_services()
+        with METRICS.span('rank_to_frame'):
+            self.final_df = self.ranked.to_frame()
+        return self.final_df
+
+    def md_files(self):
+        return [f"{service}.md" for service in self.final_df['Service']]
+
+    def pareto_frontier(self, max_labels=MAX_PARETO_LABELS):
+        """
+        Every selection within budget that no other selection beats on both hours saved and quality.
+        Returns a DataFrame with one row per selection, from most hours saved to highest quality.
+        Past max_labels partial selections per task the frontier is thinned, and the DataFrame's
+        attrs['truncated'] is True.
+        """
+        ranked = getattr(self, 'ranked', None) or self.rank_services()
+        catalog = self.catalog
+        prices = catalog.prices[ranked.index]
+        frontier = pareto_frontier(ranked.automation_stat, ranked.quality_stat, prices, catalog.task_index[ranked.index], self.budget,
+                                   _constraints(catalog, ranked.index, self.copilot), max_labels)
+        frame = pd.DataFrame({
+            'Hours saved': frontier.automation,
+            'Quality': frontier.quality,
+            'Price per month': frontier.spend,
+            'Services': [list(catalog.services[ranked.index[selected]]) for selected in frontier.selections],
+        })
+        frame.attrs['truncated'] = frontier.truncated
+        return frame
+
+    def budget_sweep(self, budgets=None):
+        """
+        Hours saved by the selection the objective picks, for a range of budgets from one knapsack pass.
+        budgets defaults to every whole dollar from 0 to the spend beyond which more budget
+        changes nothing. Returns a DataFrame with the Budget, the Hours saved and the Price per
+        month of the selection at each budget.
+        """
+        ranked = getattr(self, 'ranked', None) or self.rank_services()
+        if self.objective == "automation" or np.isnan(self.user_auto_scores).all():
+            return _budget_sweep(ranked, self.copilot, budgets)
+        return _budget_sweep(ranked, self.copilot, budgets, *self._objective_values(ranked.automation_stat, ranked.quality_stat))
+
+    @classmethod
+    def rank_batch(cls, profiles, budgets, copilot, catalog=CATALOG):
+        """
+        Rank many user profiles in one vectorized pass.
+        profiles is an N x 14 array of the 7 automation answers followed by the 7 quality answers,
+        one per catalog task (NaN for a missing answer), budgets one budget per profile as Ranker
+        takes it, and copilot a flag for all profiles or one per profile. Returns a long DataFrame
+        with a 'Profile' column and the same columns as Ranker.rank, ordered by profile and rank.
+        """
+        profiles = np.asarray(profiles, dtype=float)
+        n_tasks = len(catalog.tasks)
+        assert profiles.ndim == 2 and profiles.shape[1] == 2 * n_tasks, f"Expected N x {2 * n_tasks} profiles, got {profiles.shape}"
+        n_profiles = len(profiles)
+        budgets = np.broadcast_to(np.asarray(budgets, dtype=float), (n_profiles,))
+        copilot = np.broadcast_to(np.asarray(copilot, dtype=bool), (n_profiles,))
+
+        # A profile with any missing answer counts as all zeros, as in Ranker
+        auto_answers, quality_answers = profiles[:, :n_tasks], profiles[:, n_tasks:]
+        auto_answers = np.where(np.isnan(auto_answers).any(axis=1, keepdims=True), 0, auto_answers)
+        quality_answers = np.where(np.isnan(quality_answers).any(axis=1, keepdims=True), 0, quality_answers)
+
+        # Fan the answers out to the services and score them against the catalog
+        user_auto_scores = auto_answers[:, catalog.task_index]
+        automation_stat = catalog.auto_scores * 0.1 * user_auto_scores
+        quality_stat = catalog.quality_scores * 0.1 * quality_answers[:, catalog.task_index]
+        prices = catalog.prices
+
+        available = copilot[:, None] | ~catalog.in_bundle[None, :]
+        if catalog.requires:
+            # Dependencies need the constrained solver, one profile at a time
+            selected = np.zeros(automation_stat.shape, dtype=bool)
+            for k in range(n_profiles):
+                index = _available(catalog, copilot[k])
+                available[k] = False
+                available[k, index] = True
+                selected[k, index] = knapsack_select(automation_stat[k, index], prices[index], catalog.task_index[index],
+                                                     budgets[k], _constraints(catalog, index, True))
         else:
-            prob = lp.LpProblem("Maximize_Automation_Stat", lp.LpMaximize)
+            selected = knapsack_select_batch(np.where(available, automation_stat, -np.inf), prices, catalog.task_index, budgets)
+
+        # Sort each profile by automation_stat, then quality_stat, with unavailable services last
+        order = np.lexsort((-quality_stat, -automation_stat, ~available), axis=1)
+        rows = np.arange(n_profiles)[:, None]
+        keep = available[rows, order]
+        service_index = order[keep]
+        profile_index = np.broadcast_to(rows, order.shape)[keep]
+        ranks = np.cumsum(keep, axis=1)[keep]
+
+        return pd.DataFrame({
+            'Profile': profile_index,
+            'Rank': ranks,
+            'Service': catalog.services[service_index],
+            'Hours saved': automation_stat[profile_index, service_index],
+            'Hours spent': user_auto_scores[profile_index, service_index],
+            'Quality Score': catalog.quality_scores[service_index],
+            'Price per month': prices[service_index],
+            'Task': catalog.task_names[service_index],
+            'selected': selected[profile_index, service_index],
+        })
+
+
+class RankerSession:
+    """
+    Incremental Ranker for one user who re-submits with a few answers changed.
+    Only the services of tasks whose answers changed get their stats recomputed, and the
+    previous selection is reused without solving while it is provably still optimal.
+    """
+    def __init__(self, solver="knapsack", catalog=CATALOG, executor=None):
+        assert solver in SOLVERS, f"Unknown solver {solver}, expected one of {list(SOLVERS)}"
+        self.catalog = catalog
+        self.solver = solver
+        self.executor = executor
+        # State of the last rank() call, in catalog-position order of self.index
+        self.copilot = None
+        self.budget = None
+        self.auto_answers = None
+        self.quality_answers = None
+        self.index = None
+        self.tasks = None
+        self.prices = None
+        self.automation_stat = None
+        self.quality_stat = None
+        self.cost_effectiveness = None
+        self.selected = None
+        self.spend = None
+        # False when the last selection is the executor's greedy fallback, which is never reused
+        self.exact = True
+        # Sorted inputs of the last actual solve, to look its frontier segment up again
+        self._solve_args = None
+        # Why the last selection was reused, or None when it was solved
+        self.reused = None
 
-            # Create a dictionary of pulp variables with keys from the DataFrame index
-            selection_vars = lp.LpVariable.dicts("Select", df_sorted.index, 0, 1, lp.LpBinary)
+    def _reuse_reason(self, budget):
+        # The auto answers are unchanged, so the selection is optimal at self.budget
+        if math.floor(budget) == math.floor(self.budget):
+            # Prices are whole dollars, so the same selections fit
+            return 'same_budget'
+        if budget < self.budget and self.spend <= budget:
+            # Fewer selections fit now, but the optimal one still does
+            return 'within_budget'
+        if self.solver == 'frontier' and self._solve_args is not None:
+            frontier = budget_frontier(*self._solve_args)
+            if frontier.segment(budget) == frontier.segment(self.budget):
+                return 'same_segment'
+        return None
 
-            # Objective Function: Maximize the sum of automation_stat for selected services
-            prob += lp.lpSum([selection_vars[i] * df_sorted.loc[i, 'automation_stat'] for i in df_sorted.index])
+    def rank_services(self, budget, user_auto_scores_raw, user_quality_scores_raw, copilot):
+        """
+        Same contract as Ranker(...).rank_services(), reusing what the last call computed.
+        """
+        catalog = self.catalog
+        n_tasks = len(catalog.tasks)
+        assert len(user_auto_scores_raw) == n_tasks, f"{len(user_auto_scores_raw)}!={n_tasks}"
+        assert len(user_quality_scores_raw) == n_tasks, f"{len(user_quality_scores_raw)}!={n_tasks}"
+        assert budget is not None, "Budget is missing"
+        auto_answers = _task_answers(user_auto_scores_raw)
+        quality_answers = _task_answers(user_quality_scores_raw)
+        copilot = bool(copilot)
 
-            # Budget Constraint: The total price of selected services should not exceed the budget
-            prob += lp.lpSum([selection_vars[i] * df_sorted.loc[i, 'price'] for i in df_sorted.index]) <= self.budget
+        with METRICS.span('rank_score_sort'):
+            if self.index is None or copilot != self.copilot:
+                # First call, or a different set of services: everything is new
+                self.index = _available(catalog, copilot)
+                self.tasks = catalog.task_index[self.index]
+                self.prices = catalog.prices[self.index]
+                self.automation_stat = np.empty(len(self.index))
+                self.quality_stat = np.empty(len(self.index))
+                self.cost_effectiveness = np.empty(len(self.index))
+                self.selected = None
+                auto_changed = np.ones(n_tasks, dtype=bool)
+                quality_changed = np.ones(n_tasks, dtype=bool)
+            else:
+                # NaN answers never compare equal, so they simply count as changed
+                auto_changed = self.auto_answers != auto_answers
+                quality_changed = self.quality_answers != quality_answers
 
-            # Each task can only have one service selected
-            for task in df_sorted['task'].unique():
-                prob += lp.lpSum(selection_vars[i] for i in df_sorted[df_sorted['task'] == task].index) <= 1
+            index, tasks, prices = self.index, self.tasks, self.prices
+            user_auto_scores = auto_answers[tasks]
 
-            # Solve the problem
-            prob.solve()
+            rows = np.flatnonzero(auto_changed[tasks])
+            if len(rows):
+                automation_stat = catalog.auto_scores[index[rows]] * 0.1 * user_auto_scores[rows]
+                row_prices = prices[rows]
+                self.automation_stat[rows] = automation_stat
+                self.cost_effectiveness[rows] = np.where(row_prices == 0, automation_stat, automation_stat / np.where(row_prices == 0, 1, row_prices))
+            rows = np.flatnonzero(quality_changed[tasks])
+            if len(rows):
+                self.quality_stat[rows] = catalog.quality_scores[index[rows]] * 0.1 * quality_answers[tasks[rows]]
 
-            # Output the selected services
-            selected_services = df_sorted.loc[[i for i in df_sorted.index if selection_vars[i].varValue == 1]]['service'].values
+            order = np.lexsort((-self.quality_stat, -self.automation_stat))
 
-        # if not (self.data['user_auto_score'].isnull()).all():
-        #     assert (df_sorted['cost_effectiveness'].reset_index(drop=True) == df_sorted['cost_effectiveness'].sort_values(ascending=False).reset_index(drop=True)).all(), "Services are not ranked in order of saved hours"
-        
-        # Ordinal rank
-        df_sorted['rank'] = range(1, len(df_sorted) + 1)
-        
-        self.final_df = df_sorted[['rank', 'service', 'automation_stat', 'user_auto_score', 'quality_score', 'price', 'task']].rename(
-            columns={'rank': 'Rank', 'service': "Service", 'automation_stat': "Hours saved", 'quality_score': 'Quality Score', 'price': 'Price per month', 'user_auto_score': 'Hours spent', 'task': 'Task'}
+        self.reused = None
+        if np.isnan(user_auto_scores).all():
+            self.selected = np.ones(len(index), dtype=bool)
+            self.exact = True
+            self._solve_args = None
+        elif self.selected is not None and self.exact and not auto_changed.any() and (reason := self._reuse_reason(budget)):
+            self.reused = reason
+        else:
+            METRICS.count('solver_calls_total', solver=self.solver)
+            with METRICS.span('rank_solve'):
+                values, sorted_prices, groups = self.automation_stat[order], prices[order], tasks[order]
+                constraints = _constraints(catalog, index[order], True)
+                selected = np.empty(len(index), dtype=bool)
+                if self.executor is None:
+                    selected[order] = SOLVERS[self.solver](values, sorted_prices, groups, budget, constraints)
+                    self.exact = True
+                else:
+                    selected[order], self.exact = self.executor.solve(self.solver, values, sorted_prices, groups, budget, constraints)
+            self.selected = selected
+            # The budget frontier knows nothing of dependencies, so only look segments up without them
+            self._solve_args = None if constraints else (values, sorted_prices, groups)
+        METRICS.count('ranker_session_total', outcome=self.reused or 'solved')
+
+        self.copilot = copilot
+        self.budget = budget
+        self.auto_answers = auto_answers
+        self.quality_answers = quality_answers
+        self.spend = prices[self.selected].sum()
+
+        return RankedServices(
+            index=index[order],
+            automation_stat=self.automation_stat[order],
+            quality_stat=self.quality_stat[order],
+            cost_effectiveness=self.cost_effectiveness[order],
+            user_auto_score=user_auto_scores[order],
+            selected=self.selected[order],
+            catalog=catalog,
         )
-        assert 'Service' in self.final_df.columns
-        self.final_df['selected'] = [val in selected_services for val in self.final_df['Service']]        
 
-    
+    def rank(self, budget, user_auto_scores_raw, user_quality_scores_raw, copilot):
+        self.ranked = self.rank_services(budget, user_auto_scores_raw, user_quality_scores_raw, copilot)
+        with METRICS.span('rank_to_frame'):
+            self.final_df = self.ranked.to_frame()
         return self.final_df
-    
+
     def md_files(self):
         return [f"{service}.md" for service in self.final_df['Service']]
+
+    def budget_sweep(self, budgets=None):
+        """
+        Same as Ranker.budget_sweep, for the services of the last rank() call.
+        """
+        return _budget_sweep(self.ranked, self.copilot, budgets)
@@ -0,0 +1,547 @@
+import bisect
+import functools
+import itertools
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+# Tolerance used when comparing summed automation stats, so float noise never
+# swaps one selection for an equally good one.
+EPS = 1e-9
+
+# The exact DP solvers split a constrained problem into one case per combination of bought
+# bundles and required services, so only a handful of those can be in play at once: Catalog
+# refuses more than MAX_CONSTRAINT_ANCHORS, and past MAX_DP_ANCHORS a single solve is cheaper
+# with pulp_select, whose time hardly depends on them (see benchmarks/bench_scaling.py --requires)
+MAX_CONSTRAINT_ANCHORS = 12
+MAX_DP_ANCHORS = 6
+
+# Cells of the knapsack DP choice tables constrained_select_batch holds at once
+DP_CHUNK_CELLS = 1 << 22
+
+# Default cap on the labels ParetoFrontier keeps after each task; past it the frontier is
+# thinned and only approximate
+MAX_PARETO_LABELS = 500
+
+
+class Constraints(NamedTuple):
+    """
+    Selection rules beyond one service per task and the budget, by service position.
+    bundles gives the bundle of each service (-1 for none); a bundle's price from bundle_prices is
+    paid once when any of its services is selected. requires lists (service, required service)
+    pairs: the first can only be selected together with the second.
+    """
+    bundles: tuple = ()
+    bundle_prices: tuple = ()
+    requires: tuple = ()
+
+    def __bool__(self):
+        return bool(self.bundle_prices) or bool(self.requires)
+
+
+def selection_spend(selected, prices, constraints=None):
+    """
+    Total price of selections (boolean masks over the last axis), including each bundle bought once.
+    """
+    selected = np.asarray(selected, dtype=bool)
+    spend = (selected * np.asarray(prices)).sum(axis=-1)
+    if constraints and constraints.bundle_prices:
+        bundles = np.asarray(constraints.bundles)
+        for b, price in enumerate(constraints.bundle_prices):
+            spend = spend + price * selected[..., bundles == b].any(axis=-1)
+    return spend
+
+
+def pulp_select(values, prices, groups, budget, constraints=None):
+    """
+    Select services with the PuLP/CBC integer program.
+    Returns a boolean mask over the services (one entry per value).
+    """
+    # Imported here so that only deployments using the ILP backend pay for loading PuLP
+    import pulp as lp
+
+    prob = lp.LpProblem("Maximize_Automation_Stat", lp.LpMaximize)
+
+    # Create a dictionary of pulp variables, one per service position
+    selection_vars = lp.LpVariable.dicts("Select", range(len(values)), 0, 1, lp.LpBinary)
+
+    # Objective Function: Maximize the sum of automation_stat for selected services
+    prob += lp.lpSum([selection_vars[i] * values[i] for i in range(len(values))])
+
+    # Bundles are bought once, and only a bought bundle's services can be selected
+    constraints = constraints or Constraints()
+    bundle_vars = lp.LpVariable.dicts("Bundle", range(len(constraints.bundle_prices)), 0, 1, lp.LpBinary)
+    for i, bundle in enumerate(constraints.bundles):
+        if bundle >= 0:
+            prob += selection_vars[i] <= bundle_vars[bundle]
+    for i, required in constraints.requires:
+        prob += selection_vars[i] <= selection_vars[required]
+
+    # Budget Constraint: The total price of selected services and bundles should not exceed the budget
+    prob += lp.lpSum([selection_vars[i] * prices[i] for i in range(len(values))] +
+                     [bundle_vars[b] * price for b, price in enumerate(constraints.bundle_prices)]) <= budget
+
+    # Each task can only have one service selected
+    for items in _task_items(groups):
+        prob += lp.lpSum(selection_vars[i] for i in items) <= 1
+
+    # Solve the problem
+    prob.solve(lp.PULP_CBC_CMD(msg=False))
+
+    return np.array([selection_vars[i].varValue == 1 for i in range(len(values))], dtype=bool)
+
+
+def _task_items(groups):
+    # Group service positions by task, keeping the order tasks first appear in
+    task_items = {}
+    for i, task in enumerate(groups):
+        task_items.setdefault(task, []).append(i)
+    return list(task_items.values())
+
+
+def _integer_prices(prices):
+    prices = np.asarray(prices)
+    assert np.all(prices == np.round(prices)), "Knapsack solver needs integer prices"
+    return prices.astype(int)
+
+
+def _knapsack_choices(values, prices, task_items, capacity, secondary=None):
+    """
+    Run the grouped knapsack DP up to capacity for every row of values (profiles x services) at once.
+    Returns one (profiles x spend limits) array per task giving the service chosen there, or -1,
+    and the best totals reachable at each spend limit: of values, and of secondary, which only
+    decides between selections with equal totals of values (zeros when not given).
+    """
+    # best[r, c] is the highest total automation stat row r reaches spending at most c
+    best = np.zeros((values.shape[0], capacity + 1))
+    best_secondary = np.zeros(best.shape)
+    choices = []
+    for items in task_items:
+        new_best = best.copy()
+        new_secondary = best_secondary if secondary is None else best_secondary.copy()
+        choice = np.full(best.shape, -1)
+        for i in items:
+            price = prices[i]
+            # Services no row may select (a value of -inf) never change the tables
+            if price > capacity or np.isneginf(values[:, i]).all():
+                continue
+            # Taking service i at spend limit c leaves c - price for the earlier tasks
+            candidate = best[:, :capacity + 1 - price] + values[:, i, None]
+            current = new_best[:, price:]
+            # Only strictly better options replace the current one, so ties keep
+            # the choice of leaving the task empty
+            better = candidate > current + EPS
+            if secondary is not None:
+                candidate_secondary = best_secondary[:, :capacity + 1 - price] + secondary[:, i, None]
+                current_secondary = new_secondary[:, price:]
+                better |= (candidate >= current - EPS) & (candidate_secondary > current_secondary + EPS)
+                np.copyto(current_secondary, candidate_secondary, where=better)
+            np.copyto(current, candidate, where=better)
+            choice[:, price:][better] = i
+        choices.append(choice)
+        best = new_best
+        best_secondary = new_secondary
+    return choices, best, best_secondary
+
+
+def _backtrack(choices, best, best_secondary, prices, rows, spend, n_services):
+    # Among equally good selections take the cheapest: start from the lowest spend
+    # limit that already reaches the optimum (both totals are non-decreasing in spend
+    # among limits that reach the best total)
+    target = best[rows, spend] - EPS
+    target_secondary = best_secondary[rows, spend] - EPS
+    spend = np.argmax((best[rows] >= target[:, None]) & (best_secondary[rows] >= target_secondary[:, None]), axis=1)
+
+    # Walk the choices of each row back from its spend limit
+    selected = np.zeros((len(rows), n_services), dtype=bool)
+    positions = np.arange(len(rows))
+    for choice in reversed(choices):
+        i = choice[rows, spend]
+        chosen = i >= 0
+        selected[positions[chosen], i[chosen]] = True
+        spend[chosen] -= prices[i[chosen]]
+    return selected
+
+
+def _max_spend(prices, task_items):
+    # No budget beyond the most expensive service of every task can be spent
+    return int(sum(max(prices[i] for i in items) for items in task_items))
+
+
+def knapsack_select_batch(values, prices, groups, budgets, chunk_size=4096, secondary=None):
+    """
+    Run knapsack_select for many profiles at once.
+    values is a (profiles x services) array, budgets one budget per profile; returns a boolean mask of the same shape.
+    Services with a value of -inf are never selected. Profiles are solved in chunks to keep memory bounded.
+    secondary, of the same shape as values, breaks ties between selections with equal totals of values.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    if secondary is not None:
+        secondary = np.broadcast_to(np.asarray(secondary, dtype=float), values.shape)
+    prices = _integer_prices(prices)
+    budgets = np.broadcast_to(np.asarray(budgets, dtype=float), values.shape[:1])
+    task_items = _task_items(groups)
+    max_spend = _max_spend(prices, task_items)
+
+    selected = np.zeros(values.shape, dtype=bool)
+    for start in range(0, len(values), chunk_size):
+        stop = start + chunk_size
+        chunk_budgets = budgets[start:stop]
+        # Missing or negative budgets leave nothing affordable
+        feasible = chunk_budgets >= 0
+        if not feasible.any():
+            continue
+        spend = np.minimum(np.floor(chunk_budgets[feasible]), max_spend).astype(int)
+        capacity = int(spend.max())
+        chunk_secondary = None if secondary is None else secondary[start:stop][feasible]
+        choices, best, best_secondary = _knapsack_choices(values[start:stop][feasible], prices, task_items, capacity, chunk_secondary)
+        selected[np.arange(start, start + len(chunk_budgets))[feasible]] = _backtrack(
+            choices, best, best_secondary, prices, np.arange(len(spend)), spend, values.shape[1]
+        )
+    return selected
+
+
+def constraint_anchors(constraints):
+    """
+    Number of bundles and distinct required services the DP solvers enumerate cases over.
+    """
+    return len(constraints.bundle_prices) + len({required for _, required in constraints.requires})
+
+
+def _constraint_cases(prices, groups, constraints):
+    """
+    Split constrained selection into plain grouped-knapsack cases, one per consistent combination
+    of bought bundles and forced-in required services. Returns (allowed, forced, fixed_price) per case:
+    the services the DP may still pick, the services selected up front, and what the bundles and
+    forced services cost.
+    """
+    n_services = len(prices)
+    bundles = np.asarray(constraints.bundles if constraints.bundles else [-1] * n_services)
+    required_by = {}
+    for i, required in constraints.requires:
+        required_by.setdefault(required, []).append(i)
+    anchors = list(required_by)
+    n_bundles = len(constraints.bundle_prices)
+    if n_bundles + len(anchors) > MAX_CONSTRAINT_ANCHORS:
+        raise ValueError(f"{n_bundles} bundles and {len(anchors)} required services exceed {MAX_CONSTRAINT_ANCHORS}")
+
+    cases = []
+    for bought in itertools.product((False, True), repeat=n_bundles):
+        for forced_on in itertools.product((False, True), repeat=len(anchors)):
+            forced = [j for j, on in zip(anchors, forced_on) if on]
+            # A forced service needs its own bundle, its own requirements, and a task to itself
+            if any(bundles[j] >= 0 and not bought[bundles[j]] for j in forced):
+                continue
+            if any(required not in forced for i, required in constraints.requires if i in forced):
+                continue
+            if len({groups[j] for j in forced}) < len(forced):
+                continue
+            allowed = np.array([bundle < 0 or bought[bundle] for bundle in bundles], dtype=bool)
+            for j, on in zip(anchors, forced_on):
+                if not on:
+                    allowed[required_by[j]] = False
+            for j in forced:
+                allowed[groups == groups[j]] = False
+            fixed_price = sum(price for price, on in zip(constraints.bundle_prices, bought) if on) + sum(prices[j] for j in forced)
+            cases.append((allowed, forced, fixed_price))
+    return cases
+
+
+def _cheapest_spend(best, best_secondary):
+    # For every row and spend limit, the lowest limit that already reaches the same totals: both
+    # totals are non-decreasing in spend, so that is where the current run of equal totals starts
+    starts = np.ones(best.shape, dtype=bool)
+    starts[:, 1:] = (best[:, 1:] > best[:, :-1] + EPS) | (best_secondary[:, 1:] > best_secondary[:, :-1] + EPS)
+    return np.maximum.accumulate(np.where(starts, np.arange(best.shape[1]), 0), axis=1)
+
+
+def constrained_select_batch(values, prices, groups, budgets, constraints, secondary=None):
+    """
+    Exact selection under bundle and dependency constraints for one score vector and many budgets.
+    Each case from _constraint_cases gets one knapsack DP up to the largest budget, which answers
+    every budget; each budget keeps its best case (highest total, then highest secondary total,
+    then lowest spend including bundles) and only that one is backtracked.
+    Returns a (budgets x services) boolean mask.
+    """
+    values = np.asarray(values, dtype=float)
+    prices = _integer_prices(prices)
+    groups = np.asarray(groups)
+    budgets = np.asarray(budgets, dtype=float)
+    task_items = _task_items(groups)
+    cases = _constraint_cases(prices, groups, constraints)
+    fixed_prices = np.array([fixed_price for _, _, fixed_price in cases])
+    limits = np.floor(budgets)
+    selected = np.zeros((len(budgets), len(values)), dtype=bool)
+    capacity = int(min(limits.max(initial=-1) - fixed_prices.min(), _max_spend(prices, task_items)))
+    if capacity < 0:
+        return selected
+
+    best_total = np.full(len(budgets), -np.inf)
+    best_secondary_total = np.full(len(budgets), -np.inf)
+    best_spend = np.full(len(budgets), np.inf)
+    # Cases are solved in chunks so the DP choice tables stay within DP_CHUNK_CELLS
+    chunk_size = max(1, DP_CHUNK_CELLS // ((capacity + 1) * max(len(task_items), 1)))
+    for start in range(0, len(cases), chunk_size):
+        chunk = cases[start:start + chunk_size]
+        case_values = np.stack([np.where(allowed, values, -np.inf) for allowed, _, _ in chunk])
+        case_secondary = None if secondary is None else np.broadcast_to(np.asarray(secondary, dtype=float), case_values.shape)
+        choices, best, best_secondary = _knapsack_choices(case_values, prices, task_items, capacity, case_secondary)
+        cheapest = _cheapest_spend(best, best_secondary)
+
+        winners = np.full(len(budgets), -1)
+        for c, (_, forced, fixed_price) in enumerate(chunk):
+            spend = np.clip(limits - fixed_price, 0, capacity).astype(int)
+            total = np.where(limits >= fixed_price, best[c, spend] + values[forced].sum(), -np.inf)
+            secondary_total = best_secondary[c, spend] + (0 if secondary is None else np.asarray(secondary)[forced].sum())
+            case_spend = cheapest[c, spend] + fixed_price
+            tied = total >= best_total - EPS
+            better = (total > best_total + EPS) | (tied & (secondary_total > best_secondary_total + EPS)) | (
+                tied & (secondary_total >= best_secondary_total - EPS) & (case_spend < best_spend))
+            better &= np.isfinite(total)
+            winners[better] = c
+            best_total[better] = total[better]
+            best_secondary_total[better] = secondary_total[better]
+            best_spend[better] = case_spend[better]
+
+        won = np.flatnonzero(winners >= 0)
+        if len(won):
+            rows = winners[won]
+            spend = (best_spend[won] - fixed_prices[start + rows]).astype(int)
+            selected[won] = _backtrack(choices, best, best_secondary, prices, rows, spend, len(values))
+            for c in np.unique(rows):
+                selected[np.ix_(won[rows == c], chunk[c][1])] = True
+    return selected
+
+
+def knapsack_select(values, prices, groups, budget, constraints=None, secondary=None):
+    """
+    Select services with an exact grouped (multiple-choice) knapsack DP over integer prices.
+    Solves the same model as pulp_select in-process: at most one service per task,
+    total price within budget, maximum total automation stat, and any bundle and
+    dependency constraints. secondary, one value per service, decides between
+    selections with equal totals. Past MAX_DP_ANCHORS bundles and required services
+    the solve goes to pulp_select, which ignores secondary.
+    """
+    if budget is None:
+        return np.zeros(len(values), dtype=bool)
+    if constraints and constraint_anchors(constraints) > MAX_DP_ANCHORS:
+        return pulp_select(values, prices, groups, budget, constraints)
+    if constraints:
+        return constrained_select_batch(values, prices, groups, [budget], constraints, secondary)[0]
+    secondary = None if secondary is None else np.asarray(secondary, dtype=float)[None, :]
+    return knapsack_select_batch(np.asarray(values, dtype=float)[None, :], prices, groups, [budget], secondary=secondary)[0]
+
+
+class BudgetFrontier:
+    """
+    Piecewise-constant map from budget to optimal selection for one score vector.
+    Built from a single knapsack DP; each budget is then answered with a bisect lookup.
+    """
+    def __init__(self, values, prices, groups):
+        values = np.asarray(values, dtype=float)
+        prices = _integer_prices(prices)
+        task_items = _task_items(groups)
+        self.max_spend = _max_spend(prices, task_items)
+        choices, best, best_secondary = _knapsack_choices(values[None, :], prices, task_items, self.max_spend)
+        spends = np.arange(self.max_spend + 1)
+        all_selected = _backtrack(choices, best, best_secondary, prices, np.zeros(len(spends), dtype=int), spends, len(values))
+
+        # Keep only the budgets at which the optimal selection changes
+        self.breakpoints = []
+        self.selections = []
+        self.totals = []
+        for spend, selected in zip(spends, all_selected):
+            if self.selections and np.array_equal(selected, self.selections[-1]):
+                continue
+            selected.flags.writeable = False
+            self.breakpoints.append(int(spend))
+            self.selections.append(selected)
+            self.totals.append(float(values[selected].sum()))
+        self._empty = np.zeros(len(values), dtype=bool)
+        self._empty.flags.writeable = False
+
+    def segment(self, budget):
+        # Index of the frontier segment covering budget, or -1 below zero
+        if budget is None or budget < 0:
+            return -1
+        return bisect.bisect_right(self.breakpoints, math.floor(budget)) - 1
+
+    def select(self, budget):
+        segment = self.segment(budget)
+        return self._empty if segment < 0 else self.selections[segment]
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_frontier(values, prices, groups):
+    return BudgetFrontier(values, prices, groups)
+
+
+def budget_frontier(values, prices, groups):
+    """
+    Return the (cached) BudgetFrontier for a score vector.
+    """
+    return _cached_frontier(tuple(np.asarray(values, dtype=float).tolist()), tuple(prices), tuple(groups))
+
+
+def frontier_select(values, prices, groups, budget, constraints=None):
+    """
+    Select services from the precomputed budget frontier of this score vector.
+    Gives the same selection as knapsack_select; only the first budget for a score vector pays for a DP.
+    The frontier has no notion of bundles or dependencies, so constrained problems go to knapsack_select.
+    """
+    if constraints:
+        return knapsack_select(values, prices, groups, budget, constraints)
+    return budget_frontier(values, prices, groups).select(budget).copy()
+
+
+def greedy_select(values, prices, groups, budget, constraints=None):
+    """
+    Fast approximate selection: take services in order of automation stat while they fit the budget,
+    at most one per task. Used as a fallback when an exact solve is not available in time.
+    Under constraints a bundle is bought with the first of its services taken, and a service is only
+    taken once everything it requires has been.
+    """
+    values = np.asarray(values, dtype=float)
+    prices = np.asarray(prices)
+    selected = np.zeros(len(values), dtype=bool)
+    if budget is None or budget < 0:
+        return selected
+    constraints = constraints or Constraints()
+    requires = {}
+    for i, required in constraints.requires:
+        requires.setdefault(i, []).append(required)
+    remaining = budget
+    taken = set()
+    bought = set()
+    # Highest stat first, cheaper first among equal stats
+    for i in np.lexsort((prices, -values)):
+        bundle = constraints.bundles[i] if constraints.bundles else -1
+        price = prices[i] + (constraints.bundle_prices[bundle] if bundle >= 0 and bundle not in bought else 0)
+        if values[i] > 0 and groups[i] not in taken and price <= remaining and all(selected[j] for j in requires.get(i, ())):
+            selected[i] = True
+            taken.add(groups[i])
+            remaining -= price
+            if bundle >= 0:
+                bought.add(bundle)
+    return selected
+
+
+class ParetoFrontier:
+    """
+    Non-dominated selections over (automation stat, quality stat) for one budget.
+    Built from a single label-setting DP over the tasks; the best selection for any weighting of
+    the two objectives lies on the frontier.
+    Under bundle and dependency constraints the DP runs once per case from _constraint_cases.
+    The label count can grow exponentially with the tasks, so after each task at most max_labels
+    are kept, spread evenly over the spend; truncated records whether that dropped any.
+    """
+    def __init__(self, auto_values, quality_values, prices, groups, budget, constraints=None, max_labels=MAX_PARETO_LABELS):
+        auto_values = np.asarray(auto_values, dtype=float)
+        quality_values = np.asarray(quality_values, dtype=float)
+        prices = _integer_prices(prices)
+        groups = np.asarray(groups)
+        n_services = len(auto_values)
+        capacity = -1 if budget is None or budget < 0 else math.floor(budget)
+
+        if constraints:
+            cases = _constraint_cases(prices, groups, constraints)
+        else:
+            cases = [(np.ones(n_services, dtype=bool), [], 0)]
+        self.truncated = False
+        labels = [self._labels(auto_values, quality_values, prices, groups, capacity, max_labels, *case) for case in cases]
+        spend, automation, quality, selections = (np.concatenate(parts) for parts in zip(*labels))
+
+        # Spend no longer matters once every task is decided: keep the (automation, quality)
+        # staircase, taking the cheapest selection among equal pairs
+        order = np.lexsort((spend, -quality, -automation))
+        keep = []
+        best_quality = -np.inf
+        for j in order:
+            if quality[j] > best_quality + EPS:
+                keep.append(j)
+                best_quality = quality[j]
+        self.automation = automation[keep]
+        self.quality = quality[keep]
+        self.spend = spend[keep]
+        self.selections = selections[keep]
+        for array in (self.automation, self.quality, self.spend, self.selections):
+            array.flags.writeable = False
+
+    def _labels(self, auto_values, quality_values, prices, groups, capacity, max_labels, allowed, forced, fixed_price):
+        # Labels: one partial selection each, with its spend and both totals, starting from the
+        # forced services and extended task by task with the allowed ones
+        selections = np.zeros((1, len(auto_values)), dtype=bool)
+        selections[0, forced] = True
+        spend = np.array([fixed_price], dtype=int)
+        automation = np.array([auto_values[forced].sum()])
+        quality = np.array([quality_values[forced].sum()])
+        if capacity < fixed_price:
+            return spend[:0], automation[:0], quality[:0], selections[:0]
+        for items in _task_items(groups):
+            extended = [(spend, automation, quality, selections)]
+            for i in (i for i in items if allowed[i]):
+                fits = spend + prices[i] <= capacity
+                with_item = selections[fits].copy()
+                with_item[:, i] = True
+                extended.append((spend[fits] + prices[i], automation[fits] + auto_values[i], quality[fits] + quality_values[i], with_item))
+            spend, automation, quality, selections = (np.concatenate(parts) for parts in zip(*extended))
+            keep = self._undominated(spend, automation, quality)
+            if max_labels and len(keep) > max_labels:
+                keep = self._thin(keep, spend[keep], automation[keep], quality[keep], max_labels)
+                self.truncated = True
+            spend, automation, quality, selections = spend[keep], automation[keep], quality[keep], selections[keep]
+        return spend, automation, quality, selections
+
+    @staticmethod
+    def _undominated(spend, automation, quality):
+        # A label is dropped when another spends no more and totals no less on both stats;
+        # of identical labels the first (which skipped the task) is kept. Labels are swept by
+        # spend against the staircase of those kept so far: automation falling, quality rising
+        order = np.lexsort((-quality, -automation, spend))
+        stair_automation, stair_quality = [], []  # automation negated, so both lists ascend
+        keep = []
+        for j, a, q in zip(order.tolist(), automation[order].tolist(), quality[order].tolist()):
+            # Kept labels with at least this automation come first; the last of them has the most quality
+            k = bisect.bisect_right(stair_automation, EPS - a)
+            if k and stair_quality[k - 1] >= q - EPS:
+                continue
+            keep.append(j)
+            # Replace the steps this label dominates, which follow each other on the staircase
+            lo = bisect.bisect_left(stair_automation, -a)
+            hi = bisect.bisect_right(stair_quality, q, lo)
+            stair_automation[lo:hi] = [-a]
+            stair_quality[lo:hi] = [q]
+        return np.sort(np.array(keep, dtype=int))
+
+    @staticmethod
+    def _thin(keep, spend, automation, quality, max_labels):
+        # Evenly spaced labels by spend, always including the best on each stat
+        by_spend = np.argsort(spend, kind='stable')
+        positions = by_spend[np.linspace(0, len(keep) - 1, max_labels - 2).round().astype(int)]
+        positions = np.union1d(positions, [np.argmax(automation), np.argmax(quality)])
+        return keep[positions]
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_pareto(auto_values, quality_values, prices, groups, budget, constraints, max_labels):
+    return ParetoFrontier(auto_values, quality_values, prices, groups, budget, constraints, max_labels)
+
+
+def pareto_frontier(auto_values, quality_values, prices, groups, budget, constraints=None, max_labels=MAX_PARETO_LABELS):
+    """
+    Return the (cached) ParetoFrontier for a pair of score vectors, a budget and any constraints.
+    """
+    budget = None if budget is None or budget < 0 else math.floor(budget)
+    return _cached_pareto(
+        tuple(np.asarray(auto_values, dtype=float).tolist()), tuple(np.asarray(quality_values, dtype=float).tolist()),
+        tuple(prices), tuple(groups), budget, constraints or None, max_labels,
+    )
+
+
+SOLVERS = {
+    "pulp": pulp_select,
+    "knapsack": knapsack_select,
+    "frontier": frontier_select,
+    "greedy": greedy_select,
+}
@@ -0,0 +1,16 @@
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+# The app's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# PuLP warns about its own deprecated calls on every solve
+warnings.filterwarnings('ignore', module='pulp')
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
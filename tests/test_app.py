@@ -0,0 +1,114 @@
+import importlib
+import sys
+
+import pytest
+
+ANSWERS = {'budget': 40, 'checkbox': False, 'input-1': 5, 'input-3': 2, 'input-7': 8}
+
+
+def load_app(monkeypatch, **env):
+    # app reads its configuration on import, so each test imports it afresh
+    for name in ('SESSION_STORE', 'SESSION_STORE_DB', 'RANKER_OBJECTIVE'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    sys.modules.pop('app', None)
+    return importlib.import_module('app')
+
+
+class Browser:
+    """
+    Calls the app's callbacks through the Dash endpoint the way the browser does, by function name.
+    Holds the value of every component property a callback read or wrote.
+    """
+    def __init__(self, module, **values):
+        self.module = module
+        self.client = module.app.server.test_client()
+        self.values = {f"{id_}.{'data' if id_ == 'session-id' else 'value'}": value for id_, value in values.items()}
+
+    def call(self, name, *triggered):
+        output, spec = next((output, spec) for output, spec in self.module.app.callback_map.items()
+                            if getattr(spec.get('callback'), '__name__', None) == name)
+        outputs = [dict(zip(('id', 'property'), item.split('@')[0].rsplit('.', 1)))
+                   for item in output.strip('.').split('...')]
+        payload = {
+            'output': output,
+            'outputs': outputs if output.startswith('..') else outputs[0],
+            'inputs': [{**dep, 'value': self.values.get(f"{dep['id']}.{dep['property']}")} for dep in spec['inputs']],
+            'state': [{**dep, 'value': self.values.get(f"{dep['id']}.{dep['property']}")} for dep in spec['state']],
+            'changedPropIds': list(triggered),
+        }
+        response = self.client.post('/_dash-update-component', json=payload)
+        if response.status_code == 204:
+            return {}
+        assert response.status_code == 200, response.get_data(as_text=True)
+        written = {}
+        for id_, props in response.get_json()['response'].items():
+            for prop, value in props.items():
+                written[f'{id_}.{prop}'] = value
+                if not isinstance(value, dict) or '__dash_patch_update' not in value:
+                    self.values[f'{id_}.{prop}'] = value
+        return written
+
+
+def test_split_callbacks_compute_once_and_refresh_their_outputs(monkeypatch):
+    browser = Browser(load_app(monkeypatch), **ANSWERS)
+    recommendation = browser.call('update_recommendation', 'submit-button-3.n_clicks')['recommendation.data']
+    assert recommendation['key'] and recommendation['auto_chart']['Task'][-1] == 'Total'
+    assert browser.call('update_auto_chart', 'recommendation.data', 'submit-button-3.n_clicks')
+    # The quality button does not redraw the automation chart
+    assert browser.call('update_auto_chart', 'recommendation.data', 'submit-button-2.n_clicks') == {}
+    # The same answers again: the store already holds their recommendation
+    assert 'recommendation.data' not in browser.call('update_recommendation', 'submit-button-2.n_clicks')
+
+
+def test_missing_budget_resets_the_outputs(monkeypatch):
+    browser = Browser(load_app(monkeypatch), **{**ANSWERS, 'budget': None})
+    written = browser.call('update_recommendation', 'submit-button-3.n_clicks')
+    assert written['error-message.children'] == "Please enter a budget."
+    assert browser.call('update_report', 'recommendation.data')['output-data-table.children'] == "No data to display."
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def session_app(request, monkeypatch, tmp_path):
+    if request.param == 'sqlite':
+        return load_app(monkeypatch, SESSION_STORE_DB=str(tmp_path / 'sessions.db'))
+    return load_app(monkeypatch, SESSION_STORE='1')
+
+
+def change(browser, field, value, version):
+    # What the browser's clientside callback sends for one changed answer
+    browser.values[f'{field}.value'] = value
+    versions = {**(browser.values.get('answer-versions.data') or {}), field: version}
+    browser.values['answer-versions.data'] = versions
+    browser.values['answer-change.data'] = {field: [value, version]}
+    browser.call('remember_answers', 'answer-change.data')
+
+
+def test_session_answers_are_saved_then_ranked(session_app):
+    browser = Browser(session_app, **{'session-id': 'tab'})
+    for version, (field, value) in enumerate(ANSWERS.items(), 1):
+        change(browser, field, value, version)
+    written = browser.call('update_recommendation', 'submit-button-3.n_clicks')
+    assert set(written['recommendation.data']) == {'key', 'exact'} and 'session-resync.data' not in written
+    session = session_app.session_store.get('tab')
+    assert session['budget'] == 40 and 'recommendation' in session
+    assert browser.call('update_report', 'recommendation.data', 'generate-report-1.n_clicks')['output-data-table.children']
+
+
+def test_stale_session_falls_back_to_the_inputs(session_app):
+    browser = Browser(session_app, **{'session-id': 'tab'})
+    for version, (field, value) in enumerate(ANSWERS.items(), 1):
+        change(browser, field, value, version)
+    # A newer budget the session never saved, as when its save was lost or the session expired
+    browser.values['budget.value'] = 60
+    browser.values['answer-versions.data'] = {**browser.values['answer-versions.data'], 'budget': len(ANSWERS) + 1}
+    written = browser.call('update_recommendation', 'submit-button-3.n_clicks')
+    assert 'recommendation.data' not in written and written['session-resync.data']['button'] == 'submit-button-3'
+
+    written = browser.call('resync_session', 'session-resync.data')
+    assert written['error-message.children'] == " " and written['recommendation.data']['key'][2] == 60
+    session = session_app.session_store.get('tab')
+    assert session['budget'] == 60 and session['budget.version'] == len(ANSWERS) + 1
+    # Saved again, the session answers the next press itself
+    assert 'session-resync.data' not in browser.call('update_recommendation', 'submit-button-3.n_clicks')
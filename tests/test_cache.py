@@ -0,0 +1,83 @@
+import pytest
+
+import cache
+from cache import RecommendationCache, SessionStore, SQLiteBackend, normalize_key
+
+
+class Clock:
+    # Stand-in for the time module whose clocks only move when told to
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used():
+    recommendations = RecommendationCache(maxsize=2)
+    recommendations.set('a', 1)
+    recommendations.set('b', 2)
+    assert recommendations.get('a') == 1
+    recommendations.set('c', 3)
+    assert recommendations.get('b') is None
+    assert recommendations.get('a') == 1 and recommendations.get('c') == 3
+    assert recommendations.stats() == {'hits': 3, 'misses': 1, 'hit_rate': 0.75, 'size': 2}
+
+
+def test_ttl_expires_entries(clock):
+    recommendations = RecommendationCache(ttl=10)
+    recommendations.set('a', 1)
+    clock.now += 9
+    assert recommendations.get('a') == 1
+    clock.now += 2
+    assert recommendations.get('a') is None
+    assert recommendations.stats()['size'] == 0
+
+
+def test_backend_shares_entries_until_they_expire(tmp_path, clock):
+    path = str(tmp_path / 'cache.db')
+    first = RecommendationCache(ttl=10, backend=SQLiteBackend(path))
+    second = RecommendationCache(ttl=10, backend=SQLiteBackend(path))
+    first.set('key', {'value': 1})
+    assert second.get('key') == {'value': 1}
+    clock.now += 11
+    assert RecommendationCache(ttl=10, backend=SQLiteBackend(path)).get('key') is None
+
+
+def test_backend_purges_expired_rows_and_caps_its_size(tmp_path, clock):
+    backend = SQLiteBackend(str(tmp_path / 'cache.db'), max_rows=3, purge_every=2)
+
+    def rows():
+        return backend._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    backend.set('old', 0, ttl=5)
+    clock.now += 10
+    backend.set(0, 0, ttl=10)
+    assert rows() == 1
+    for i in range(1, 5):
+        backend.set(i, i, ttl=10 + i)
+    assert rows() == 3 and backend.get(1) is None and backend.get(4) == 4
+
+
+@pytest.mark.parametrize('backend', [False, True])
+def test_session_update_merges_fields(backend, tmp_path):
+    sessions = SessionStore(backend=SQLiteBackend(str(tmp_path / 'sessions.db')) if backend else None)
+    assert sessions.get('tab') == {}
+    sessions.update('tab', budget=30)
+    assert sessions.update('tab', checkbox=True) == {'budget': 30, 'checkbox': True}
+    assert sessions.get('tab') == {'budget': 30, 'checkbox': True}
+
+
+def test_normalize_key_treats_a_missing_answer_as_all_zeros():
+    assert normalize_key([1, None], [2, 3], 30, 1) == ((0.0, 0.0), (2.0, 3.0), 30.0, True)
+    assert normalize_key([1, 2], [2, 3], 30.0, False) == normalize_key((1.0, 2.0), [2, 3], 30, 0)
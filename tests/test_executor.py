@@ -0,0 +1,69 @@
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from catalog import CATALOG
+from executor import SolverExecutor
+from metrics import METRICS
+from solvers import greedy_select, knapsack_select
+
+VALUES = CATALOG.auto_scores * 0.1 * np.arange(1, len(CATALOG.tasks) + 1)[CATALOG.task_index]
+ARGS = (VALUES, CATALOG.prices, CATALOG.task_index, 31)
+
+
+@pytest.fixture
+def executor():
+    executor = SolverExecutor(max_workers=1, timeout=30)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def fallbacks(monkeypatch):
+    counted = []
+    monkeypatch.setattr(METRICS, 'count', lambda name, **labels: counted.append((name, labels.get('reason'))))
+    return counted
+
+
+def test_solves_exactly_in_the_pool(executor):
+    selected, exact = executor.solve('knapsack', *ARGS)
+    assert exact
+    assert (selected == knapsack_select(*ARGS)).all()
+
+
+def test_identical_solves_share_a_future(executor, fallbacks):
+    key = ('knapsack', tuple(VALUES.tolist()), tuple(CATALOG.prices.tolist()), tuple(CATALOG.task_index.tolist()), 31, None)
+    first, _ = executor._submit(key)
+    second, _ = executor._submit(key)
+    assert first is second
+    assert ('solver_pool_coalesced_total', None) in fallbacks
+    first.result()
+
+
+def test_full_queue_falls_back_to_greedy(executor, fallbacks):
+    executor.max_pending = 1
+    executor._in_flight[('pending',)] = Future()
+    selected, exact = executor.solve('knapsack', *ARGS)
+    assert not exact
+    assert (selected == greedy_select(*ARGS)).all()
+    assert ('solver_pool_fallbacks_total', 'queue_full') in fallbacks
+
+
+def test_slow_solve_falls_back_to_greedy(executor, fallbacks):
+    executor.timeout = 1e-6
+    selected, exact = executor.solve('knapsack', *ARGS)
+    assert not exact and (selected == greedy_select(*ARGS)).all()
+    assert ('solver_pool_fallbacks_total', 'timeout') in fallbacks
+
+
+def test_broken_pool_is_replaced(executor, fallbacks):
+    executor.solve('knapsack', *ARGS)
+    for process in list(executor._pool._processes.values()):
+        process.kill()
+        process.join()
+    selected, exact = executor.solve('knapsack', *ARGS)
+    assert not exact and (selected == greedy_select(*ARGS)).all()
+    assert ('solver_pool_fallbacks_total', 'broken') in fallbacks
+    selected, exact = executor.solve('knapsack', *ARGS)
+    assert exact and (selected == knapsack_select(*ARGS)).all()
@@ -0,0 +1,64 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog import CATALOG, COPILOT_BUNDLE
+from export import export_frames, main, profile_columns, read_profiles, stream_csv, stream_parquet
+from ranker import Ranker
+
+BUNDLE_PRICE = CATALOG.bundles[COPILOT_BUNDLE]
+
+
+@pytest.fixture
+def profiles(rng):
+    n_profiles = 25
+    frame = pd.DataFrame(rng.integers(0, 11, (n_profiles, len(profile_columns()))), columns=profile_columns())
+    frame.insert(0, 'budget', rng.choice([0, 12, 25, 40, 100], n_profiles))
+    frame.insert(1, 'copilot', rng.random(n_profiles) < 0.5)
+    return frame
+
+
+def expected_rows(profiles):
+    # Ranker.rank_batch as the app would call it, with the Copilot bundle taken out of the budget
+    copilot = profiles['copilot'].to_numpy()
+    budgets = profiles['budget'].to_numpy(dtype=float)
+    under = copilot & (budgets < BUNDLE_PRICE)
+    budgets = np.where(under, -1, budgets - np.where(copilot, BUNDLE_PRICE, 0))
+    expected = Ranker.rank_batch(profiles[profile_columns()].to_numpy(dtype=float), budgets, copilot)
+    expected['Below Copilot price'] = under[expected['Profile']]
+    return expected
+
+
+def test_csv_round_trip(profiles):
+    source = io.BytesIO(profiles.to_csv(index=False).encode())
+    output = ''.join(stream_csv(export_frames(read_profiles(source, chunk_size=7))))
+    pd.testing.assert_frame_equal(pd.read_csv(io.StringIO(output)), expected_rows(profiles), check_dtype=False)
+
+
+def test_budget_below_copilot_price_is_flagged(profiles):
+    profiles['copilot'] = True
+    profiles['budget'] = BUNDLE_PRICE
+    profiles.loc[0, 'budget'] = BUNDLE_PRICE - 1
+    rows = next(export_frames([profiles]))
+    first = rows[rows['Profile'] == 0]
+    assert first['Below Copilot price'].all() and not first['selected'].any()
+    assert not rows[rows['Profile'] != 0]['Below Copilot price'].any()
+
+
+def test_parquet_round_trip(profiles):
+    pytest.importorskip('pyarrow')
+    output = b''.join(stream_parquet(export_frames([profiles.iloc[:10], profiles.iloc[10:]])))
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(output)), expected_rows(profiles), check_dtype=False)
+
+
+def test_cli_error_leaves_output_alone(profiles, tmp_path, capsys):
+    source, output = tmp_path / 'profiles.csv', tmp_path / 'results.csv'
+    profiles.drop(columns='budget').to_csv(source, index=False)
+    output.write_text('previous results')
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(source), '-o', str(output)])
+    assert exit_info.value.code == 2
+    assert 'missing columns' in capsys.readouterr().err
+    assert output.read_text() == 'previous results'
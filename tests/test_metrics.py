@@ -0,0 +1,86 @@
+import json
+import logging
+import subprocess
+import sys
+
+from flask import Flask
+
+from metrics import Metrics
+
+
+def test_disabled_metrics_record_nothing(tmp_path):
+    metrics = Metrics(directory=str(tmp_path))
+    metrics.count('solver_calls_total', solver='knapsack')
+    with metrics.span('ranker_init'), metrics.request('submit-button') as fields:
+        fields['cache'] = 'miss'
+    metrics.flush()
+    assert metrics.render() == '\n' and not list(tmp_path.iterdir())
+
+
+def test_render_in_prometheus_text_format():
+    metrics = Metrics(enabled=True)
+    metrics.describe('solver_calls_total', 'Selection solves by solver backend')
+    metrics.count('solver_calls_total', solver='knapsack')
+    metrics.count('solver_calls_total', 2, solver='knapsack')
+    metrics.observe('response_bytes', 100)
+    metrics.observe('response_bytes', 300)
+    metrics.gauge('cache_size', 'Recommendations held in the cache', lambda: 7)
+    assert metrics.render().splitlines() == [
+        '# HELP course_app_solver_calls_total Selection solves by solver backend',
+        '# TYPE course_app_solver_calls_total counter',
+        'course_app_solver_calls_total{solver="knapsack"} 3',
+        '# TYPE course_app_response_bytes summary',
+        'course_app_response_bytes_count 2',
+        'course_app_response_bytes_sum 400',
+        'course_app_response_bytes_max 300',
+        '# HELP course_app_cache_size Recommendations held in the cache',
+        '# TYPE course_app_cache_size gauge',
+        'course_app_cache_size 7',
+    ]
+
+
+def test_request_logs_its_spans_as_one_line(caplog):
+    metrics = Metrics(enabled=True)
+    with caplog.at_level(logging.INFO, logger='course_app.requests'):
+        with metrics.request('submit-button') as fields:
+            with metrics.span('ranker_init'):
+                pass
+            fields['cache'] = 'miss'
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['button_id'] == 'submit-button' and record['cache'] == 'miss'
+    assert set(record['stages']) == {'ranker_init'}
+    assert 'course_app_callback_seconds_count{button_id="submit-button"} 1' in metrics.render()
+
+
+def test_directory_sums_every_process(tmp_path):
+    # Two registries stand in for two live workers; a file from a dead pid for an exited one
+    first, second = (Metrics(enabled=True, directory=str(tmp_path)) for _ in range(2))
+    for metrics, size in ((first, 1), (second, 2)):
+        metrics.count('solver_calls_total', solver='knapsack')
+        metrics.gauge('cache_size', 'Recommendations held in the cache', lambda size=size: size)
+        metrics.flush()
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    snapshot = {'counters': [['solver_calls_total', [['solver', 'knapsack']], 5]], 'summaries': [],
+                'gauges': [['cache_size', 99]]}
+    (tmp_path / f'{dead.pid}-0.json').write_text(json.dumps(snapshot))
+
+    lines = first.render().splitlines()
+    assert 'course_app_solver_calls_total{solver="knapsack"} 7' in lines
+    gauges = [line for line in lines if line.startswith('course_app_cache_size')]
+    assert len(gauges) == 2 and not any(line.endswith(' 99') for line in gauges)
+
+
+def test_register_serves_metrics_and_times_callbacks():
+    metrics = Metrics(enabled=True)
+    server = Flask(__name__)
+
+    @server.route('/_dash-update-component', methods=['POST'])
+    def callback():
+        return 'x' * 50
+
+    metrics.register(server)
+    client = server.test_client()
+    client.post('/_dash-update-component')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'course_app_response_bytes_sum 50' in text and 'course_app_response_seconds_count 1' in text
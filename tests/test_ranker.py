@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from catalog import CATALOG, Catalog
+from ranker import Ranker, RankerSession
+from solvers import MAX_CONSTRAINT_ANCHORS
+
+N_TASKS = len(CATALOG.tasks)
+
+
+def random_answers(rng, missing=False):
+    answers = rng.integers(0, 11, N_TASKS).tolist()
+    if missing:
+        answers[int(rng.integers(N_TASKS))] = None
+    return answers
+
+
+def test_rank_batch_matches_ranker(rng):
+    n_profiles = 60
+    auto_answers = [random_answers(rng, missing=k % 20 == 0) for k in range(n_profiles)]
+    quality_answers = [random_answers(rng) for _ in range(n_profiles)]
+    budgets = rng.choice([0, 5, 12, 19, 20, 31, 51, 100], n_profiles)
+    copilot = rng.random(n_profiles) < 0.5
+    profiles = np.array([[np.nan if a is None else a for a in auto] + quality for auto, quality in zip(auto_answers, quality_answers)], dtype=float)
+
+    batch = Ranker.rank_batch(profiles, budgets, copilot)
+    for k in range(n_profiles):
+        expected = Ranker(budgets[k], auto_answers[k], quality_answers[k], copilot[k]).rank()
+        got = batch[batch['Profile'] == k].drop(columns='Profile').reset_index(drop=True)
+        assert list(got['Service']) == list(expected['Service'])
+        assert got['Hours saved'].to_numpy() == pytest.approx(expected['Hours saved'].to_numpy())
+        assert got['Hours saved'][got['selected']].sum() == pytest.approx(expected['Hours saved'][expected['selected']].sum())
+
+
+@pytest.mark.parametrize('solver', ['knapsack', 'frontier'])
+def test_session_matches_fresh_ranker(solver, rng):
+    for _ in range(20):
+        session = RankerSession(solver=solver)
+        auto, quality = random_answers(rng), random_answers(rng)
+        budget, copilot = int(rng.integers(0, 80)), bool(rng.integers(2))
+        for _ in range(10):
+            edit = rng.integers(4)
+            if edit == 0:
+                auto[rng.integers(N_TASKS)] = int(rng.integers(0, 11))
+            elif edit == 1:
+                quality[rng.integers(N_TASKS)] = int(rng.integers(0, 11))
+            elif edit == 2:
+                budget = max(0, budget + int(rng.integers(-10, 11)))
+            else:
+                copilot = not copilot
+            got = session.rank(budget, auto, quality, copilot)
+            expected = Ranker(budget, auto, quality, copilot, solver=solver).rank()
+            assert got.drop(columns='selected').equals(expected.drop(columns='selected'))
+            assert got['Price per month'][got['selected']].sum() <= budget
+            assert got['Hours saved'][got['selected']].sum() == pytest.approx(expected['Hours saved'][expected['selected']].sum())
+
+
+@pytest.mark.parametrize('objective', ['weighted', 'lexicographic'])
+def test_objectives_pick_from_the_pareto_frontier(objective, rng):
+    for _ in range(30):
+        ranker = Ranker(int(rng.integers(0, 80)), random_answers(rng), random_answers(rng), bool(rng.integers(2)),
+                        objective=objective, quality_weight=0.3)
+        ranked = ranker.rank_services()
+        frontier = ranker.pareto_frontier()
+        automation, quality = ranked.automation_stat[ranked.selected].sum(), ranked.quality_stat[ranked.selected].sum()
+        if objective == 'weighted':
+            scores = 0.7 * frontier['Hours saved'] + 0.3 * frontier['Quality']
+            assert 0.7 * automation + 0.3 * quality == pytest.approx(scores.max())
+        else:
+            best = frontier.iloc[0]
+            assert (automation, quality) == pytest.approx((best['Hours saved'], best['Quality']))
+
+
+def test_catalog_rejects_too_many_constraint_anchors():
+    n = MAX_CONSTRAINT_ANCHORS + 2
+    services = [{'name': f"Service {s}", 'task': 'Task', 'price': 1, 'auto_score': 1, 'quality_score': 1} for s in range(2 * n)]
+    for s in range(n):
+        services[n + s]['requires'] = [services[s]['name']]
+    with pytest.raises(ValueError):
+        Catalog(1, ['Task'], services)
+
+
+@pytest.mark.parametrize('objective', ['automation', 'weighted', 'lexicographic'])
+def test_budget_sweep_matches_ranker_at_each_budget(objective, rng):
+    for _ in range(6):
+        auto, quality, copilot = random_answers(rng), random_answers(rng), bool(rng.integers(2))
+        optional_bundles = bool(rng.integers(2))
+        budgets = np.arange(0, 90, 7)
+        sweep = Ranker(0, auto, quality, copilot, objective=objective, quality_weight=0.3,
+                       optional_bundles=optional_bundles).budget_sweep(budgets)
+        assert list(sweep['Budget']) == list(budgets)
+        for budget, hours, spend in zip(budgets, sweep['Hours saved'], sweep['Price per month']):
+            ranked = Ranker(budget, auto, quality, copilot, objective=objective, quality_weight=0.3,
+                            optional_bundles=optional_bundles).rank()
+            assert hours == pytest.approx(ranked['Hours saved'][ranked['selected']].sum())
+            assert spend <= budget
+
+
+def test_catalog_rejects_fractional_bundle_prices():
+    services = [{'name': "Service", 'task': 'Task', 'price': 0, 'auto_score': 1, 'quality_score': 1, 'bundle': "Bundle"}]
+    with pytest.raises(ValueError):
+        Catalog(1, ['Task'], services, [{'name': "Bundle", 'price': 19.99}])
@@ -0,0 +1,116 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from catalog import CATALOG
+from solvers import (Constraints, ParetoFrontier, _task_items, constrained_select_batch, frontier_select, knapsack_select, pulp_select,
+                     selection_spend)
+
+EXACT_SOLVERS = [knapsack_select, frontier_select]
+
+
+def random_problem(rng, constrained):
+    # A small random catalog slice: services over a few tasks, optionally with bundles and dependencies
+    n = int(rng.integers(3, 9))
+    groups = rng.integers(0, 4, n)
+    prices = rng.integers(0, 15, n)
+    auto_values = rng.integers(0, 6, n) * 0.5
+    quality_values = rng.integers(0, 6, n) * 0.5
+    constraints = None
+    if constrained:
+        n_bundles = int(rng.integers(0, 3))
+        bundles = tuple(int(b) if b < n_bundles else -1 for b in rng.integers(0, n_bundles + 2, n))
+        bundle_prices = tuple(int(price) for price in rng.integers(1, 15, n_bundles))
+        requires = tuple(sorted({(int(i), int(j)) for i, j in rng.integers(0, n, (int(rng.integers(0, 3)), 2)) if i != j}))
+        constraints = Constraints(bundles, bundle_prices, requires)
+    return auto_values, quality_values, prices, groups, int(rng.integers(0, 40)), constraints
+
+
+def feasible_selections(prices, groups, budget, constraints):
+    # Every selection with at most one service per task that satisfies the constraints and budget
+    constraints = constraints or Constraints()
+    for combo in itertools.product(*[[None] + items for items in _task_items(groups)]):
+        selected = np.zeros(len(prices), dtype=bool)
+        selected[[i for i in combo if i is not None]] = True
+        if any(selected[i] and not selected[j] for i, j in constraints.requires):
+            continue
+        if selection_spend(selected, prices, constraints) <= budget:
+            yield selected
+
+
+def assert_feasible(selected, prices, groups, budget, constraints):
+    assert np.bincount(groups[selected]).max(initial=0) <= 1
+    assert selection_spend(selected, prices, constraints) <= budget
+    assert all(selected[j] for i, j in (constraints or Constraints()).requires if selected[i])
+
+
+@pytest.mark.parametrize('solver', EXACT_SOLVERS)
+def test_matches_pulp_on_random_profiles(solver, rng):
+    groups, prices = CATALOG.task_index, CATALOG.prices
+    for _ in range(40):
+        values = CATALOG.auto_scores * 0.1 * rng.integers(0, 11, len(CATALOG.tasks))[groups]
+        budget = int(rng.choice([0, 5, 12, 20, 31, 51, 100]))
+        selected = solver(values, prices, groups, budget)
+        reference = pulp_select(values, prices, groups, budget)
+        assert_feasible(selected, prices, groups, budget, None)
+        assert values[selected].sum() == pytest.approx(values[reference].sum())
+
+
+@pytest.mark.parametrize('solver', EXACT_SOLVERS)
+def test_constrained_matches_brute_force(solver, rng):
+    for _ in range(150):
+        auto_values, _, prices, groups, budget, constraints = random_problem(rng, constrained=True)
+        selected = solver(auto_values, prices, groups, budget, constraints)
+        assert_feasible(selected, prices, groups, budget, constraints)
+        best = max(auto_values[candidate].sum() for candidate in feasible_selections(prices, groups, budget, constraints))
+        assert auto_values[selected].sum() == pytest.approx(best)
+
+
+def test_constrained_batch_answers_every_budget(rng):
+    for _ in range(60):
+        auto_values, _, prices, groups, _, constraints = random_problem(rng, constrained=True)
+        budgets = np.arange(45)
+        selected = constrained_select_batch(auto_values, prices, groups, budgets, constraints)
+        candidates = list(feasible_selections(prices, groups, budgets.max(), constraints))
+        for budget, mask in zip(budgets, selected):
+            assert_feasible(mask, prices, groups, budget, constraints)
+            fitting = [auto_values[c].sum() for c in candidates if selection_spend(c, prices, constraints) <= budget]
+            assert auto_values[mask].sum() == pytest.approx(max(fitting, default=0.0))
+
+
+def test_secondary_breaks_ties(rng):
+    for _ in range(100):
+        auto_values, quality_values, prices, groups, budget, constraints = random_problem(rng, constrained=bool(rng.integers(2)))
+        selected = knapsack_select(auto_values, prices, groups, budget, constraints, secondary=quality_values)
+        best = max((auto_values[candidate].sum(), quality_values[candidate].sum())
+                   for candidate in feasible_selections(prices, groups, budget, constraints))
+        assert (auto_values[selected].sum(), quality_values[selected].sum()) == pytest.approx(best)
+
+
+def test_pareto_frontier_matches_brute_force(rng):
+    for _ in range(150):
+        auto_values, quality_values, prices, groups, budget, constraints = random_problem(rng, constrained=bool(rng.integers(2)))
+        points = {(auto_values[selected].sum(), quality_values[selected].sum())
+                  for selected in feasible_selections(prices, groups, budget, constraints)}
+        expected = sorted(p for p in points if not any(o != p and o[0] >= p[0] and o[1] >= p[1] for o in points))
+
+        frontier = ParetoFrontier(auto_values, quality_values, prices, groups, budget, constraints)
+        assert sorted(zip(frontier.automation.tolist(), frontier.quality.tolist())) == expected
+        assert not frontier.truncated
+        for selected, spend in zip(frontier.selections, frontier.spend):
+            assert_feasible(selected, prices, groups, budget, constraints)
+            assert selection_spend(selected, prices, constraints) == spend
+
+
+def test_pareto_frontier_cap(rng):
+    groups = np.repeat(np.arange(12), 3)
+    prices = rng.integers(0, 20, len(groups))
+    auto_values, quality_values = rng.random(len(groups)), rng.random(len(groups))
+    exact = ParetoFrontier(auto_values, quality_values, prices, groups, 120, max_labels=None)
+    capped = ParetoFrontier(auto_values, quality_values, prices, groups, 120, max_labels=20)
+    assert capped.truncated and not exact.truncated
+    # Thinned, the frontier still holds real selections, none better than the exact frontier
+    for selected, automation, quality in zip(capped.selections, capped.automation, capped.quality):
+        assert_feasible(selected, prices, groups, 120, None)
+        assert ((exact.automation >= automation - 1e-9) & (exact.quality >= quality - 1e-9)).any()
@@ -0,0 +1,17 @@
+"""
+WSGI entry point for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Importing app loads the service catalog, builds the figure templates and pulls in
+every heavy import, so with preload_app the workers fork with all of it already in
+memory and share it copy-on-write.
+"""
+from app import app
+
+server = app.server
+
+# Dash finishes its setup on the first request it serves, and concurrent first
+# requests on a fresh worker can see it half done. Serve one here, before the
+# workers fork, so they all start fully set up.
+server.test_client().get('/_dash-layout')